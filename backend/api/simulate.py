@@ -7,19 +7,17 @@ from services.bayesian import BayesianUpdateEngine
 from utils.geojson_exporter import generate_geojson
 from cache.redis_cache import cache_simulation, get_cached_simulation
 from services.real_data_ingestor import RealDataIngestor, fetch_real_aircraft_data
-from services.database_manager import SARDatabase
+from services.database_manager import sar_db
 import uuid
 from datetime import datetime
 import logging
 from typing import Optional, List, Dict
-import os
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 # Initialize services
-sar_db = SARDatabase()
-data_ingestor = RealDataIngestor(openweather_api_key=os.getenv('OPENWEATHER_API_KEY'), database=sar_db)
+data_ingestor = RealDataIngestor(database=sar_db)
 
 @router.post("", response_model=SimulationResponse)
 async def simulate_search_zone(
@@ -323,7 +321,7 @@ async def simulate_with_real_time_data(
         logger.info("Starting real-time SAR simulation")
         
         # Get real-time data with intelligent caching
-        real_data = data_ingestor.build_simulation_input_with_cache(
+        real_data = await data_ingestor.build_simulation_input_with_cache_async(
             prefer_cache=prefer_cache,
             max_cache_age_hours=max_cache_age_hours
         )
@@ -511,6 +509,7 @@ async def monitor_active_aircraft():
         # Get all valid aircraft
         states = opensky_data.get('states', [])
         all_aircraft = []
+        now = time.time()  # One clock snapshot for the whole feed
         
         for state_array in states:
             try:
@@ -543,11 +542,11 @@ async def monitor_active_aircraft():
                             "vertical_rate": aircraft.vertical_rate
                         },
                         "last_contact": datetime.fromtimestamp(aircraft.last_contact).isoformat(),
-                        "time_since_contact": int(time.time() - aircraft.last_contact)
+                        "time_since_contact": int(now - aircraft.last_contact)
                     }
                     
                     # Add SAR priority assessment
-                    validation = ingestor.validate_aircraft_for_sar(aircraft)
+                    validation = ingestor.validate_aircraft_for_sar(aircraft, now, with_warnings=False)
                     aircraft_info["sar_assessment"] = {
                         "priority_level": _calculate_sar_priority_level(aircraft),
                         "data_quality": validation["quality_grade"],
@@ -557,7 +556,7 @@ async def monitor_active_aircraft():
                     all_aircraft.append(aircraft_info)
                     
             except Exception as e:
-                logger.debug(f"Skipping aircraft due to error: {str(e)}")
+                logger.debug("Skipping aircraft due to error: %s", e)
                 continue
         
         # Sort by SAR priority (highest first)
@@ -601,6 +600,8 @@ async def detect_aircraft_anomalies():
         
         anomalies = []
         states = opensky_data.get('states', [])
+        # One detection time for the whole sweep
+        detection_time = datetime.now().isoformat()
         
         for state_array in states:
             try:
@@ -627,19 +628,19 @@ async def detect_aircraft_anomalies():
                             "anomalies": detected_anomalies,
                             "severity": _assess_anomaly_severity(detected_anomalies),
                             "recommended_action": _get_recommended_action(detected_anomalies),
-                            "detection_time": datetime.now().isoformat()
+                            "detection_time": detection_time
                         }
                         anomalies.append(anomaly_report)
                         
             except Exception as e:
-                logger.debug(f"Error processing aircraft for anomalies: {str(e)}")
+                logger.debug("Error processing aircraft for anomalies: %s", e)
                 continue
         
         # Sort by severity
         anomalies.sort(key=lambda x: _get_severity_score(x["severity"]), reverse=True)
         
         return {
-            "detection_timestamp": datetime.now().isoformat(),
+            "detection_timestamp": detection_time,
             "total_anomalies_detected": len(anomalies),
             "critical_anomalies": len([a for a in anomalies if a["severity"] == "CRITICAL"]),
             "anomalies": anomalies,
@@ -1008,7 +1009,7 @@ async def simulate_with_real_time_data(
         logger.info("Starting real-time SAR simulation")
         
         # Get real-time data with intelligent caching
-        real_data = data_ingestor.build_simulation_input_with_cache(
+        real_data = await data_ingestor.build_simulation_input_with_cache_async(
             prefer_cache=prefer_cache,
             max_cache_age_hours=max_cache_age_hours
         )
@@ -2,6 +2,7 @@ import os
 
 class Settings:
     REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+    OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY")
     SIMULATION_CACHE_EXPIRE = 3600  # 1 hour
     MONTE_CARLO_SIMULATIONS = 2000
     FUEL_DENSITY = 0.8  # kg/L
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import logging
@@ -7,6 +7,7 @@ from datetime import datetime
 
 # Import API routers
 from api import simulate, assets, report, scenario
+from services.database_manager import request_connection_scope
 
 # Configure logging
 logging.basicConfig(
@@ -33,6 +34,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Reuse a warm SQLite read connection for the lifetime of each request
+@app.middleware("http")
+async def database_connection_scope(request: Request, call_next):
+    with request_connection_scope():
+        return await call_next(request)
+
 # Include API routers
 app.include_router(simulate.router, prefix="/api/simulate", tags=["Simulation"])
 app.include_router(assets.router, prefix="/api/assets", tags=["Asset Management"])
@@ -3,11 +3,114 @@ import math
 from typing import Tuple, List
 from schemas.telemetry import TelemetryInput, WindData
 
+try:
+    from numba import njit, prange
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+    prange = range
+    
+    def njit(*args, **kwargs):
+        """No-op stand-in so the kernels below run as plain Python"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
 # Physical constants
 KNOTS_TO_MPS = 0.514444
 EARTH_RADIUS_M = 6371000
 GRAVITY = 9.81
 
+# Piecewise-linear wind shear profile: speed factor at each altitude knot (m),
+# held constant above the jet stream
+WIND_SHEAR_ALTITUDES_M = np.array([0.0, 1000.0, 5000.0, 12000.0, 20000.0])
+WIND_SHEAR_FACTORS = np.array([0.7, 0.7, 1.2, 2.0, 3.5])
+
+# Direction backing with altitude is a step function over the same bands
+DIRECTION_SHIFT_BOUNDS_M = np.array([1000.0, 5000.0, 12000.0])
+DIRECTION_SHIFTS = np.array([0.0, 15.0, 30.0, 45.0])
+
+# Element type of the (samples x steps) Monte Carlo work arrays. Per-step
+# displacements are tiny and totals are accumulated in float64, so single
+# precision costs well under a metre while halving memory traffic.
+DRIFT_DTYPE = np.float32
+
+# Points per gaussian_kde evaluation, bounds the (n_points x n_samples) work array
+KDE_EVAL_CHUNK = 10000
+
+@njit(cache=True, fastmath=True)
+def _wind_at_altitude(altitude_ft, surface_speed, surface_direction):
+    """Scalar wind shear model shared by the compiled descent loop"""
+    altitude_m = altitude_ft * 0.3048
+    wind_factor = np.interp(altitude_m, WIND_SHEAR_ALTITUDES_M, WIND_SHEAR_FACTORS)
+    direction_shift = DIRECTION_SHIFTS[np.searchsorted(DIRECTION_SHIFT_BOUNDS_M, altitude_m, side='right')]
+    return surface_speed * wind_factor, (surface_direction + direction_shift) % 360
+
+@njit(cache=True, fastmath=True)
+def _drift_step(lat, lon, altitude, wind_speed, wind_direction, dt, drag_coefficient):
+    """Advance one descent time step; returns the new (lat, lon)"""
+    meters_per_degree = EARTH_RADIUS_M * math.pi / 180
+    speed_knots, direction_deg = _wind_at_altitude(altitude, wind_speed, wind_direction)
+    speed_mps = speed_knots * KNOTS_TO_MPS
+    direction_rad = math.radians(direction_deg)
+    
+    # Apply drag coefficient and atmospheric density
+    factor = drag_coefficient * math.exp(-altitude * 0.3048 / 8400) * dt
+    displacement_north = speed_mps * math.cos(direction_rad) * factor
+    displacement_east = speed_mps * math.sin(direction_rad) * factor
+    
+    lon += displacement_east / (meters_per_degree * math.cos(math.radians(lat)))
+    lat += displacement_north / meters_per_degree
+    return lat, lon
+
+@njit(cache=True, fastmath=True)
+def _drift_loop(lat, lon, altitude_ft, wind_speed, wind_direction, dt,
+                descent_rate, drag_coefficient, n_steps):
+    """
+    Run the descent drift loop for n_steps time steps.
+    
+    Returns:
+        (n_steps + 1, 2) array of (lat, lon) positions including the start
+    """
+    positions = np.empty((n_steps + 1, 2))
+    positions[0, 0] = lat
+    positions[0, 1] = lon
+    altitude = altitude_ft
+    
+    for i in range(n_steps):
+        lat, lon = _drift_step(lat, lon, altitude, wind_speed, wind_direction, dt, drag_coefficient)
+        altitude -= descent_rate * dt
+        
+        positions[i + 1, 0] = lat
+        positions[i + 1, 1] = lon
+    
+    return positions
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _descent_endpoints(lat, lon, altitude_ft, wind_speeds, wind_directions, dt,
+                       descent_rate, drag_coefficient, n_steps):
+    """
+    Final descent position for every wind sample, one sample per thread.
+    
+    Returns:
+        (n_samples, 2) array of (lat, lon) positions
+    """
+    n = wind_speeds.shape[0]
+    out = np.empty((n, 2))
+    for j in prange(n):
+        sample_lat = lat
+        sample_lon = lon
+        altitude = altitude_ft
+        for _ in range(n_steps):
+            sample_lat, sample_lon = _drift_step(
+                sample_lat, sample_lon, altitude, wind_speeds[j], wind_directions[j],
+                dt, drag_coefficient
+            )
+            altitude -= descent_rate * dt
+        out[j, 0] = sample_lat
+        out[j, 1] = sample_lon
+    return out
+
 class WindDriftModel:
     """Advanced wind drift modeling for aircraft debris and survival equipment"""
     
@@ -43,10 +146,26 @@ class WindDriftModel:
         Returns:
             List of (lat, lon) positions showing drift path
         """
+        path = self.calculate_drift_path(
+            start_lat, start_lon, altitude_ft, wind_data, time_seconds, object_type
+        )
+        return list(map(tuple, path.tolist()))
+    
+    def calculate_drift_path(
+        self,
+        start_lat: float,
+        start_lon: float,
+        altitude_ft: float,
+        wind_data: WindData,
+        time_seconds: int,
+        object_type: str = "debris"
+    ) -> np.ndarray:
+        """
+        Array form of calculate_drift_vectors.
         
-        positions = [(start_lat, start_lon)]
-        current_lat, current_lon = start_lat, start_lon
-        current_altitude = altitude_ft
+        Returns:
+            (N, 2) array of (lat, lon) positions showing drift path
+        """
         
         # Object-specific parameters
         descent_rate = self._get_descent_rate(object_type, altitude_ft)
@@ -54,37 +173,34 @@ class WindDriftModel:
         
         # Simulate descent with wind drift
         dt = 60  # 1 minute time steps
-        total_time = 0
-        
-        while current_altitude > 0 and total_time < time_seconds:
-            # Get wind conditions for current altitude
-            wind_speed, wind_direction = self._get_wind_at_altitude(
-                current_altitude, wind_data
+        if altitude_ft > 0 and time_seconds > 0:
+            n_steps = min(
+                math.ceil(altitude_ft / (descent_rate * dt)),
+                math.ceil(time_seconds / dt)
             )
-            
-            # Calculate wind drift for this time step
-            drift_lat, drift_lon = self._calculate_drift_step(
-                current_lat, current_lon, current_altitude,
-                wind_speed, wind_direction, dt, drag_coefficient
-            )
-            
-            current_lat += drift_lat
-            current_lon += drift_lon
-            current_altitude -= descent_rate * dt
-            total_time += dt
-            
-            positions.append((current_lat, current_lon))
+        else:
+            n_steps = 0
+        
+        path = _drift_loop(
+            float(start_lat), float(start_lon), float(altitude_ft),
+            float(wind_data.speed), float(wind_data.direction), float(dt),
+            float(descent_rate), float(drag_coefficient), n_steps
+        )
+        current_lat, current_lon = path[-1]
+        current_altitude = altitude_ft - n_steps * descent_rate * dt
+        total_time = n_steps * dt
         
         # Continue surface drift if object reaches surface before time limit
         if current_altitude <= 0 and total_time < time_seconds:
             remaining_time = time_seconds - total_time
-            surface_positions = self._calculate_surface_drift(
-                current_lat, current_lon, wind_data, 
+            surface_path = self._surface_drift_path(
+                float(current_lat), float(current_lon), wind_data, 
                 remaining_time, object_type
             )
-            positions.extend(surface_positions)
+            if len(surface_path):
+                path = np.concatenate([path, surface_path])
         
-        return positions
+        return path
     
     def _get_descent_rate(self, object_type: str, altitude_ft: float) -> float:
         """Get descent rate in feet per second based on object type"""
@@ -113,6 +229,152 @@ class WindDriftModel:
         }
         return drag_coefficients.get(object_type, 1.2)
     
+    def _wind_profile(self, altitude_ft: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized wind factor and direction shift for an array of altitudes"""
+        altitude_m = np.asarray(altitude_ft, dtype=np.float64) * 0.3048
+        wind_factor = np.interp(altitude_m, WIND_SHEAR_ALTITUDES_M, WIND_SHEAR_FACTORS)
+        direction_shift = DIRECTION_SHIFTS[
+            np.searchsorted(DIRECTION_SHIFT_BOUNDS_M, altitude_m, side='right')
+        ]
+        return wind_factor, direction_shift
+    
+    def calculate_final_positions_batch(
+        self,
+        start_lat: float,
+        start_lon: float,
+        altitude_ft: float,
+        wind_speeds: np.ndarray,
+        wind_directions: np.ndarray,
+        time_seconds: int,
+        object_type: str = "debris"
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized equivalent of calculate_drift_vectors for many wind samples.
+        
+        The descent profile (altitude per step) does not depend on the wind, so
+        every sample shares the same altitude, density and wind-shear arrays and
+        the per-sample drift reduces to a few broadcast operations.
+        
+        Args:
+            start_lat: Starting latitude
+            start_lon: Starting longitude
+            altitude_ft: Initial altitude in feet
+            wind_speeds: Surface wind speed per sample (knots)
+            wind_directions: Surface wind direction per sample (degrees)
+            time_seconds: Time since last contact
+            object_type: Type of drifting object (debris, survival_raft, etc.)
+        
+        Returns:
+            Tuple of (final_lats, final_lons) arrays, one entry per sample
+        """
+        wind_speeds = np.asarray(wind_speeds, dtype=np.float64)
+        wind_directions = np.asarray(wind_directions, dtype=np.float64)
+        n = wind_speeds.shape[0]
+        meters_per_degree = EARTH_RADIUS_M * math.pi / 180
+        
+        descent_rate = self._get_descent_rate(object_type, altitude_ft)
+        drag_coefficient = self._get_drag_coefficient(object_type)
+        dt = 60
+        
+        # Number of descent steps taken by the scalar while-loop
+        if altitude_ft > 0 and time_seconds > 0:
+            n_steps = min(
+                math.ceil(altitude_ft / (descent_rate * dt)),
+                math.ceil(time_seconds / dt)
+            )
+        else:
+            n_steps = 0
+        
+        lats = np.full(n, float(start_lat))
+        lons = np.full(n, float(start_lon))
+        
+        if n_steps > 0 and _HAS_NUMBA:
+            # Compiled per-sample loops across all cores, no (n, n_steps) temporaries
+            endpoints = _descent_endpoints(
+                float(start_lat), float(start_lon), float(altitude_ft),
+                wind_speeds, wind_directions, float(dt),
+                float(descent_rate), float(drag_coefficient), n_steps
+            )
+            lats = endpoints[:, 0]
+            lons = endpoints[:, 1]
+        elif n_steps > 0:
+            # Shared per-step atmosphere: shape (n_steps,)
+            altitudes = altitude_ft - np.arange(n_steps) * descent_rate * dt
+            wind_factor, direction_shift = self._wind_profile(altitudes)
+            density = np.exp(-altitudes * 0.3048 / 8400)
+            scale = (drag_coefficient * density * dt / meters_per_degree).astype(DRIFT_DTYPE)
+            
+            # Per-sample, per-step wind components: shape (n, n_steps)
+            speed_mps = (wind_speeds.astype(DRIFT_DTYPE)[:, None] *
+                         (wind_factor * KNOTS_TO_MPS).astype(DRIFT_DTYPE)[None, :])
+            direction_rad = np.radians(
+                (wind_directions.astype(DRIFT_DTYPE)[:, None] +
+                 direction_shift.astype(DRIFT_DTYPE)[None, :]) % DRIFT_DTYPE(360)
+            )
+            dlat = speed_mps * np.cos(direction_rad) * scale
+            deast = speed_mps * np.sin(direction_rad) * scale
+            
+            # Longitude scaling uses the latitude at the start of each step
+            lat_before = np.empty_like(dlat)
+            lat_before[:, 0] = 0
+            np.cumsum(dlat[:, :-1], axis=1, out=lat_before[:, 1:])
+            lat_before += DRIFT_DTYPE(start_lat)
+            dlon = deast / np.cos(np.radians(lat_before))
+            
+            lats = start_lat + dlat.sum(axis=1, dtype=np.float64)
+            lons = start_lon + dlon.sum(axis=1, dtype=np.float64)
+        
+        # Surface drift for the time remaining after touchdown
+        remaining_time = time_seconds - n_steps * dt
+        if altitude_ft - n_steps * descent_rate * dt <= 0 and remaining_time > 0:
+            lats, lons = self._surface_drift_batch(
+                lats, lons, wind_speeds, wind_directions, remaining_time, object_type
+            )
+        
+        return lats, lons
+    
+    def _surface_drift_batch(
+        self,
+        lats: np.ndarray,
+        lons: np.ndarray,
+        wind_speeds: np.ndarray,
+        wind_directions: np.ndarray,
+        time_seconds: int,
+        object_type: str
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized equivalent of _calculate_surface_drift returning final positions"""
+        dt = 3600
+        steps = int(time_seconds // dt)
+        if steps == 0:
+            return lats, lons
+        
+        meters_per_degree = EARTH_RADIUS_M * math.pi / 180
+        surface_wind_factor = 0.05 if object_type == "survival_raft" else 0.03
+        
+        speed_mps = wind_speeds * KNOTS_TO_MPS * surface_wind_factor
+        direction_rad = np.radians(wind_directions)
+        wind_north = speed_mps * np.cos(direction_rad)
+        wind_east = speed_mps * np.sin(direction_rad)
+        
+        # Coriolis deflection is a fixed rotation applied from the second hour on
+        deflection = 2 * 7.2921e-5 * np.sin(np.radians(lats)) * dt
+        rot_north = wind_north * np.cos(deflection) - wind_east * np.sin(deflection)
+        rot_east = wind_north * np.sin(deflection) + wind_east * np.cos(deflection)
+        
+        # Per-step displacement in degrees: shape (n, steps)
+        dlat = np.repeat((rot_north * dt / meters_per_degree).astype(DRIFT_DTYPE)[:, None], steps, axis=1)
+        dlat[:, 0] = wind_north * dt / meters_per_degree
+        step_east = np.repeat((rot_east * dt / meters_per_degree).astype(DRIFT_DTYPE)[:, None], steps, axis=1)
+        step_east[:, 0] = wind_east * dt / meters_per_degree
+        
+        lat_before = np.empty_like(dlat)
+        lat_before[:, 0] = 0
+        np.cumsum(dlat[:, :-1], axis=1, out=lat_before[:, 1:])
+        lat_before += lats.astype(DRIFT_DTYPE)[:, None]
+        dlon = step_east / np.cos(np.radians(lat_before))
+        
+        return lats + dlat.sum(axis=1, dtype=np.float64), lons + dlon.sum(axis=1, dtype=np.float64)
+    
     def _get_wind_at_altitude(
         self, 
         altitude_ft: float, 
@@ -124,23 +386,11 @@ class WindDriftModel:
         """
         altitude_m = altitude_ft * 0.3048
         
-        # Wind typically increases with altitude up to jet stream
-        if altitude_m < 1000:
-            # Surface layer - reduced wind
-            wind_factor = 0.7
-            direction_shift = 0
-        elif altitude_m < 5000:
-            # Boundary layer - gradual increase
-            wind_factor = 0.7 + (altitude_m - 1000) / 4000 * 0.5
-            direction_shift = 15  # Backing with altitude
-        elif altitude_m < 12000:
-            # Lower atmosphere - stronger winds
-            wind_factor = 1.2 + (altitude_m - 5000) / 7000 * 0.8
-            direction_shift = 30
-        else:
-            # Upper atmosphere - jet stream effects
-            wind_factor = 2.0 + min((altitude_m - 12000) / 8000, 1.0) * 1.5
-            direction_shift = 45
+        # Wind typically increases with altitude up to jet stream, backing as it does
+        wind_factor = float(np.interp(altitude_m, WIND_SHEAR_ALTITUDES_M, WIND_SHEAR_FACTORS))
+        direction_shift = float(DIRECTION_SHIFTS[
+            np.searchsorted(DIRECTION_SHIFT_BOUNDS_M, altitude_m, side='right')
+        ])
         
         wind_speed = surface_wind.speed * wind_factor
         wind_direction = (surface_wind.direction + direction_shift) % 360
@@ -193,9 +443,24 @@ class WindDriftModel:
         object_type: str
     ) -> List[Tuple[float, float]]:
         """Calculate surface drift for objects floating on water"""
+        path = self._surface_drift_path(start_lat, start_lon, wind_data, time_seconds, object_type)
+        return list(map(tuple, path.tolist()))
+    
+    def _surface_drift_path(
+        self,
+        start_lat: float,
+        start_lon: float,
+        wind_data: WindData,
+        time_seconds: int,
+        object_type: str
+    ) -> np.ndarray:
+        """Surface drift as an (hours, 2) array of (lat, lon) positions"""
         
-        positions = []
-        current_lat, current_lon = start_lat, start_lon
+        # Simulate surface drift in 1-hour steps
+        dt = 3600  # 1 hour
+        steps = int(time_seconds // dt)
+        if steps <= 0:
+            return np.empty((0, 2))
         
         # Surface drift parameters
         surface_wind_factor = 0.03  # 3% of wind speed for surface current
@@ -205,40 +470,31 @@ class WindDriftModel:
         wind_speed_mps = wind_data.speed * KNOTS_TO_MPS * surface_wind_factor
         wind_direction_rad = math.radians(wind_data.direction)
         
-        # Add Coriolis effect for long-duration drift
-        coriolis_factor = 2 * 7.2921e-5 * math.sin(math.radians(start_lat))
+        # Wind-driven current is constant over the drift
+        wind_north = wind_speed_mps * math.cos(wind_direction_rad)
+        wind_east = wind_speed_mps * math.sin(wind_direction_rad)
         
-        # Simulate surface drift in 1-hour steps
-        dt = 3600  # 1 hour
-        steps = time_seconds // dt
+        # Coriolis deflection (90° to the right in Northern Hemisphere) is a fixed
+        # rotation, significant after the first hour
+        coriolis_deflection = 2 * 7.2921e-5 * math.sin(math.radians(start_lat)) * dt
+        cos_def = math.cos(coriolis_deflection)
+        sin_def = math.sin(coriolis_deflection)
         
-        for step in range(steps):
-            # Wind-driven current
-            wind_north = wind_speed_mps * math.cos(wind_direction_rad)
-            wind_east = wind_speed_mps * math.sin(wind_direction_rad)
-            
-            # Add Coriolis deflection (90° to the right in Northern Hemisphere)
-            if step > 0:  # After first hour, Coriolis becomes significant
-                coriolis_deflection = coriolis_factor * dt
-                wind_north_corrected = wind_north * math.cos(coriolis_deflection) - wind_east * math.sin(coriolis_deflection)
-                wind_east_corrected = wind_north * math.sin(coriolis_deflection) + wind_east * math.cos(coriolis_deflection)
-                wind_north, wind_east = wind_north_corrected, wind_east_corrected
-            
-            # Calculate displacement
-            displacement_north = wind_north * dt
-            displacement_east = wind_east * dt
-            
-            # Convert to degrees
-            lat_displacement = displacement_north / (EARTH_RADIUS_M * math.pi / 180)
-            lon_displacement = displacement_east / (
-                EARTH_RADIUS_M * math.pi / 180 * math.cos(math.radians(current_lat))
-            )
-            
-            current_lat += lat_displacement
-            current_lon += lon_displacement
-            positions.append((current_lat, current_lon))
+        step_north = np.full(steps, wind_north * cos_def - wind_east * sin_def)
+        step_east = np.full(steps, wind_north * sin_def + wind_east * cos_def)
+        step_north[0] = wind_north
+        step_east[0] = wind_east
         
-        return positions
+        # Convert displacements to degrees; longitude scales with the latitude
+        # at the start of each step
+        meters_per_degree = EARTH_RADIUS_M * math.pi / 180
+        lats = start_lat + np.cumsum(step_north * dt / meters_per_degree)
+        lat_before = np.empty(steps)
+        lat_before[0] = start_lat
+        lat_before[1:] = lats[:-1]
+        lons = start_lon + np.cumsum(step_east * dt / (meters_per_degree * np.cos(np.radians(lat_before))))
+        
+        return np.column_stack([lats, lons])
 
 # Enhanced wind modeling functions
 async def calculate_wind_drift_probability(
@@ -252,48 +508,36 @@ async def calculate_wind_drift_probability(
         List of (lat, lon, probability) tuples
     """
     
+    if n_simulations <= 0:
+        return []
+    
     drift_model = WindDriftModel()
-    all_positions = []
     
-    # Run multiple simulations with wind uncertainty
-    for _ in range(n_simulations):
-        # Add wind uncertainty (±20% speed, ±10° direction)
-        wind_speed_var = telemetry.wind.speed * (1 + np.random.normal(0, 0.2))
-        wind_dir_var = telemetry.wind.direction + np.random.normal(0, 10)
-        
-        varied_wind = WindData(
-            speed=max(0, wind_speed_var),
-            direction=wind_dir_var % 360
-        )
-        
-        # Calculate drift path
-        positions = await drift_model.calculate_drift_vectors(
-            telemetry.lat,
-            telemetry.lon,
-            telemetry.altitude,
-            varied_wind,
-            telemetry.time_since_contact,
-            "debris"
-        )
-        
-        # Use final position for probability calculation
-        if positions:
-            all_positions.append(positions[-1])
+    # Add wind uncertainty (±20% speed, ±10° direction) for all simulations at once
+    wind_speeds = np.maximum(0, telemetry.wind.speed * (1 + np.random.normal(0, 0.2, n_simulations)))
+    wind_dirs = (telemetry.wind.direction + np.random.normal(0, 10, n_simulations)) % 360
     
-    # Calculate probability density
-    if not all_positions:
-        return []
+    # Final drift position of every simulation
+    lats, lons = drift_model.calculate_final_positions_batch(
+        telemetry.lat,
+        telemetry.lon,
+        telemetry.altitude,
+        wind_speeds,
+        wind_dirs,
+        telemetry.time_since_contact,
+        "debris"
+    )
     
+    # Calculate probability density
     from scipy.stats import gaussian_kde
     
-    lats, lons = zip(*all_positions)
     positions_array = np.vstack([lons, lats])
     kde = gaussian_kde(positions_array)
     
-    # Generate probability grid
-    probability_positions = []
-    for lat, lon in all_positions:
-        probability = kde.evaluate([[lon], [lat]])[0]
-        probability_positions.append((lat, lon, probability))
+    # Evaluate the density at every simulated position in one call per chunk
+    n_chunks = max(1, math.ceil(n_simulations / KDE_EVAL_CHUNK))
+    probabilities = np.concatenate([
+        kde(chunk) for chunk in np.array_split(positions_array, n_chunks, axis=1)
+    ])
     
-    return probability_positions
+    return list(zip(lats.tolist(), lons.tolist(), probabilities.tolist()))
@@ -1,12 +1,79 @@
 import numpy as np
+from scipy.spatial import cKDTree
 from typing import List, Dict, Any
+from dataclasses import dataclass
 from schemas.asset import SearchAsset, OptimizedRoute, AssetOptimizationResponse
 from schemas.zone import Coordinate
 import math
 import logging
 
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """No-op stand-in so the kernels below run as plain Python"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+try:
+    import numexpr as ne
+    _HAS_NUMEXPR = True
+except ImportError:
+    _HAS_NUMEXPR = False
+
 logger = logging.getLogger(__name__)
 
+# Earth radius in nautical miles
+EARTH_RADIUS_NM = 3440.065
+
+# Distance matrices smaller than this stay on NumPy; numexpr only pays off
+# once its thread pool has enough elements to split
+NUMEXPR_MIN_ELEMENTS = 250_000
+
+@dataclass
+class CoordArray:
+    """Structure-of-arrays coordinate list (degrees) used for the numeric work"""
+    lats: np.ndarray
+    lons: np.ndarray
+    
+    @classmethod
+    def from_coordinates(cls, coords: List[Coordinate]) -> "CoordArray":
+        """Unpack a list of Coordinate models"""
+        n = len(coords)
+        return cls(
+            np.fromiter((c.lat for c in coords), dtype=np.float64, count=n),
+            np.fromiter((c.lon for c in coords), dtype=np.float64, count=n)
+        )
+    
+    @classmethod
+    def empty(cls) -> "CoordArray":
+        return cls(np.empty(0), np.empty(0))
+    
+    def __len__(self) -> int:
+        return self.lats.shape[0]
+    
+    def radians(self) -> np.ndarray:
+        """(N, 2) array of [lat, lon] in radians"""
+        return np.radians(np.column_stack([self.lats, self.lons]))
+    
+    def subset(self, index) -> "CoordArray":
+        """Select coordinates by boolean mask or index array"""
+        return CoordArray(self.lats[index], self.lons[index])
+    
+    def concat(self, other: "CoordArray") -> "CoordArray":
+        return CoordArray(
+            np.concatenate([self.lats, other.lats]),
+            np.concatenate([self.lons, other.lons])
+        )
+    
+    def to_coordinate(self, i: int) -> Coordinate:
+        return Coordinate(lat=float(self.lats[i]), lon=float(self.lons[i]))
+    
+    def to_coordinates(self) -> List[Coordinate]:
+        """Convert back to Coordinate models at the API boundary"""
+        return [Coordinate(lat=lat, lon=lon) for lat, lon in zip(self.lats.tolist(), self.lons.tolist())]
+
 async def optimize_asset_deployment(
     assets: List[SearchAsset],
     search_zones: List[dict],
@@ -38,19 +105,19 @@ async def optimize_asset_deployment(
         return AssetOptimizationResponse(
             routes=[],
             total_coverage=0.0,
-            uncovered_high_prob_areas=high_prob_areas,
+            uncovered_high_prob_areas=high_prob_areas.to_coordinates(),
             optimization_summary={"message": "No available assets for deployment"}
         )
     
     # Generate optimized routes for each asset
     routes = []
-    covered_areas = []
+    covered_areas = CoordArray.empty()
     
     for asset in available_assets:
         route = generate_asset_route(asset, high_prob_areas, covered_areas, priority_weights)
         if route:
             routes.append(route)
-            covered_areas.extend(route.waypoints)
+            covered_areas = covered_areas.concat(CoordArray.from_coordinates(route.waypoints))
     
     # Calculate coverage metrics
     total_coverage = calculate_total_coverage(routes, high_prob_areas)
@@ -70,9 +137,9 @@ async def optimize_asset_deployment(
         optimization_summary=optimization_summary
     )
 
-def extract_high_probability_areas(search_zones: List[dict]) -> List[Coordinate]:
+def extract_high_probability_areas(search_zones: List[dict]) -> CoordArray:
     """Extract coordinates of high-probability areas from GeoJSON features"""
-    high_prob_areas = []
+    centroids = []
     
     for zone in search_zones:
         if zone.get("type") == "Feature":
@@ -86,10 +153,11 @@ def extract_high_probability_areas(search_zones: List[dict]) -> List[Coordinate]
                 if coordinates:
                     # Get centroid of polygon
                     polygon_coords = coordinates[0]  # Exterior ring
-                    centroid = calculate_polygon_centroid(polygon_coords)
-                    high_prob_areas.append(Coordinate(lat=centroid[1], lon=centroid[0]))
+                    centroids.append(calculate_polygon_centroid(polygon_coords))
     
-    return high_prob_areas
+    # Centroids are [lon, lat] pairs
+    lon_lat = np.array(centroids, dtype=np.float64).reshape(-1, 2)
+    return CoordArray(lats=lon_lat[:, 1].copy(), lons=lon_lat[:, 0].copy())
 
 def calculate_polygon_centroid(coordinates: List[List[float]]) -> List[float]:
     """Calculate centroid of a polygon"""
@@ -103,8 +171,8 @@ def calculate_polygon_centroid(coordinates: List[List[float]]) -> List[float]:
 
 def generate_asset_route(
     asset: SearchAsset,
-    high_prob_areas: List[Coordinate],
-    covered_areas: List[Coordinate],
+    high_prob_areas: CoordArray,
+    covered_areas: CoordArray,
     priority_weights: Dict[str, float]
 ) -> OptimizedRoute:
     """Generate an optimized search route for a single asset"""
@@ -131,7 +199,7 @@ def generate_asset_route(
     
     return OptimizedRoute(
         asset_id=asset.id,
-        waypoints=waypoints,
+        waypoints=waypoints.to_coordinates(),
         search_pattern="expanding_square",
         estimated_time_hours=estimated_time,
         coverage_area_km2=coverage_area,
@@ -145,111 +213,184 @@ def calculate_max_search_time(asset: SearchAsset) -> float:
 
 def find_reachable_areas(
     asset: SearchAsset,
-    high_prob_areas: List[Coordinate],
-    covered_areas: List[Coordinate]
-) -> List[Coordinate]:
+    high_prob_areas: CoordArray,
+    covered_areas: CoordArray
+) -> CoordArray:
     """Find areas within asset's operational range that aren't already covered"""
-    reachable = []
-    asset_pos = asset.current_location
+    if not high_prob_areas:
+        return CoordArray.empty()
+    
     max_range_nm = asset.asset_type.range_nm * 0.4  # Reserve fuel for return
+    area_rad = high_prob_areas.radians()
     
-    for area in high_prob_areas:
-        # Check if area is already covered
-        if any(distance_nm(area, covered) < 5.0 for covered in covered_areas):
-            continue
-            
-        # Check if area is within range
-        distance = distance_nm(asset_pos, area)
-        if distance <= max_range_nm:
-            reachable.append(area)
+    # Check if area is within range
+    reachable_mask = _haversine_matrix_nm(
+        coordinates_to_radians([asset.current_location]), area_rad
+    )[0] <= max_range_nm
     
-    return reachable
+    # Skip areas already covered by another asset
+    if covered_areas:
+        covered_dist = _haversine_matrix_nm(area_rad, covered_areas.radians())
+        reachable_mask &= covered_dist.min(axis=1) >= 5.0
+    
+    return high_prob_areas.subset(reachable_mask)
 
-def distance_nm(coord1: Coordinate, coord2: Coordinate) -> float:
-    """Calculate distance between two coordinates in nautical miles"""
-    lat1, lon1 = math.radians(coord1.lat), math.radians(coord1.lon)
-    lat2, lon2 = math.radians(coord2.lat), math.radians(coord2.lon)
+@njit(cache=True, fastmath=True)
+def distance_nm_raw(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Haversine distance in nautical miles between two points given in degrees"""
+    lat1, lon1 = math.radians(lat1), math.radians(lon1)
+    lat2, lon2 = math.radians(lat2), math.radians(lon2)
     
     dlat = lat2 - lat1
     dlon = lon2 - lon1
     
     a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-    c = 2 * math.asin(math.sqrt(a))
+    c = 2 * math.asin(math.sqrt(min(a, 1.0)))
     
-    # Earth radius in nautical miles
-    earth_radius_nm = 3440.065
-    return earth_radius_nm * c
+    return EARTH_RADIUS_NM * c
+
+@njit(cache=True, fastmath=True)
+def _path_length_nm(lats: np.ndarray, lons: np.ndarray) -> float:
+    """Total length in nautical miles of the polyline through the given points"""
+    total = 0.0
+    for i in range(lats.shape[0] - 1):
+        total += distance_nm_raw(lats[i], lons[i], lats[i + 1], lons[i + 1])
+    return total
+
+def distance_nm(coord1: Coordinate, coord2: Coordinate) -> float:
+    """Calculate distance between two coordinates in nautical miles"""
+    return distance_nm_raw(coord1.lat, coord1.lon, coord2.lat, coord2.lon)
+
+def route_distance_nm(waypoints: CoordArray) -> float:
+    """Calculate the total distance along the waypoints in nautical miles"""
+    return _path_length_nm(waypoints.lats, waypoints.lons)
+
+def coordinates_to_radians(coords: List[Coordinate]) -> np.ndarray:
+    """Stack coordinates into an (N, 2) array of [lat, lon] in radians"""
+    return np.radians(np.array([[c.lat, c.lon] for c in coords], dtype=np.float64).reshape(-1, 2))
+
+def _haversine_matrix_nm(rad_a: np.ndarray, rad_b: np.ndarray) -> np.ndarray:
+    """Pairwise haversine distances (nm) between two (N, 2) radian arrays"""
+    lat1 = rad_a[:, 0:1]
+    lon1 = rad_a[:, 1:2]
+    lat2 = rad_b[:, 0][None, :]
+    lon2 = rad_b[:, 1][None, :]
+    
+    # Latitude cosines depend on one side only; compute them per row/column
+    cos_lat1 = np.cos(lat1)
+    cos_lat2 = np.cos(lat2)
+    
+    if (_HAS_NUMEXPR and ne.get_num_threads() > 1 and
+            rad_a.shape[0] * rad_b.shape[0] >= NUMEXPR_MIN_ELEMENTS):
+        # Fused, multithreaded evaluation; the second pass reuses the first buffer
+        h = ne.evaluate("sin((lat2 - lat1) / 2) ** 2 + cos_lat1 * cos_lat2 * sin((lon2 - lon1) / 2) ** 2")
+        return ne.evaluate("R * 2 * arcsin(sqrt(where(h < 1.0, h, 1.0)))",
+                           local_dict={'h': h, 'R': EARTH_RADIUS_NM}, out=h)
+    
+    a = np.sin((lat2 - lat1) / 2) ** 2 + cos_lat1 * cos_lat2 * np.sin((lon2 - lon1) / 2) ** 2
+    return EARTH_RADIUS_NM * 2 * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+def _unit_vectors(rad: np.ndarray) -> np.ndarray:
+    """Project (N, 2) [lat, lon] radians onto the unit sphere as (N, 3) xyz"""
+    cos_lat = np.cos(rad[:, 0])
+    return np.column_stack([cos_lat * np.cos(rad[:, 1]), cos_lat * np.sin(rad[:, 1]), np.sin(rad[:, 0])])
+
+def _coverage_mask(areas: CoordArray, waypoints: CoordArray, radius_nm: float = 10.0) -> np.ndarray:
+    """Boolean mask of areas lying within radius_nm of any waypoint"""
+    if not waypoints or not areas:
+        return np.zeros(len(areas), dtype=bool)
+    
+    # Ball query on the unit sphere: a great-circle radius maps to a chord length
+    chord = 2 * math.sin(radius_nm / EARTH_RADIUS_NM / 2)
+    tree = cKDTree(_unit_vectors(waypoints.radians()))
+    return tree.query_ball_point(_unit_vectors(areas.radians()), r=chord, return_length=True) > 0
 
 def generate_search_waypoints(
     asset: SearchAsset,
-    target_areas: List[Coordinate],
+    target_areas: CoordArray,
     max_time_hours: float
-) -> List[Coordinate]:
+) -> CoordArray:
     """Generate search waypoints using a nearest-neighbor approach"""
+    start = asset.current_location
     if not target_areas:
-        return []
+        return CoordArray.empty()
     
-    waypoints = [asset.current_location]
-    remaining_areas = target_areas.copy()
-    current_pos = asset.current_location
+    route = []  # Indices into target_areas in visiting order
     total_time = 0.0
     
-    while remaining_areas and total_time < max_time_hours:
-        # Find nearest unvisited area
-        nearest_area = min(remaining_areas, key=lambda area: distance_nm(current_pos, area))
+    # Chord length on the unit sphere is monotonic in great-circle distance,
+    # so a 3D KD-tree returns the same nearest area as a haversine scan
+    area_xyz = _unit_vectors(target_areas.radians())
+    tree = cKDTree(area_xyz)
+    current_lat, current_lon = start.lat, start.lon
+    current_xyz = _unit_vectors(coordinates_to_radians([start]))[0]
+    visited = np.zeros(len(target_areas), dtype=bool)
+    remaining = len(target_areas)
+    
+    while remaining and total_time < max_time_hours:
+        # Find nearest unvisited area, widening the query until one turns up
+        k = 1
+        while True:
+            _, idx = tree.query(current_xyz, k=k)
+            idx = np.atleast_1d(idx)
+            unvisited = idx[~visited[idx]]
+            if unvisited.size:
+                nearest = int(unvisited[0])
+                break
+            k = min(k * 2, len(target_areas))
+        nearest_lat = target_areas.lats[nearest]
+        nearest_lon = target_areas.lons[nearest]
         
         # Calculate time to reach this area
-        travel_distance = distance_nm(current_pos, nearest_area)
+        travel_distance = distance_nm_raw(current_lat, current_lon, nearest_lat, nearest_lon)
         travel_time = travel_distance / asset.asset_type.speed_knots
         
         if total_time + travel_time > max_time_hours:
             break
             
-        waypoints.append(nearest_area)
-        remaining_areas.remove(nearest_area)
-        current_pos = nearest_area
+        route.append(nearest)
+        visited[nearest] = True
+        remaining -= 1
+        current_lat, current_lon = nearest_lat, nearest_lon
+        current_xyz = area_xyz[nearest]
         total_time += travel_time
     
-    return waypoints
+    # The route starts from the asset's current location
+    visited_areas = target_areas.subset(np.array(route, dtype=np.intp))
+    return CoordArray(
+        np.concatenate([[start.lat], visited_areas.lats]),
+        np.concatenate([[start.lon], visited_areas.lons])
+    )
 
-def calculate_coverage_area(waypoints: List[Coordinate], search_width_nm: float) -> float:
+def calculate_coverage_area(waypoints: CoordArray, search_width_nm: float) -> float:
     """Calculate total area covered by the search pattern"""
     if len(waypoints) < 2:
         return 0.0
     
-    total_distance = 0.0
-    for i in range(len(waypoints) - 1):
-        total_distance += distance_nm(waypoints[i], waypoints[i + 1])
+    total_distance = route_distance_nm(waypoints)
     
     # Convert to km² (1 nm² = 3.43 km²)
     coverage_area_nm2 = total_distance * search_width_nm
     return coverage_area_nm2 * 3.43
 
-def calculate_route_time(waypoints: List[Coordinate], speed_knots: float) -> float:
+def calculate_route_time(waypoints: CoordArray, speed_knots: float) -> float:
     """Calculate total time to complete the route"""
     if len(waypoints) < 2:
         return 0.0
     
-    total_distance = 0.0
-    for i in range(len(waypoints) - 1):
-        total_distance += distance_nm(waypoints[i], waypoints[i + 1])
+    total_distance = route_distance_nm(waypoints)
     
     return total_distance / speed_knots
 
-def calculate_probability_covered(waypoints: List[Coordinate], high_prob_areas: List[Coordinate]) -> float:
+def calculate_probability_covered(waypoints: CoordArray, high_prob_areas: CoordArray) -> float:
     """Calculate what percentage of high-probability areas will be covered"""
     if not high_prob_areas:
         return 0.0
     
-    covered_count = 0
-    for area in high_prob_areas:
-        # Check if any waypoint is within search range of this area
-        if any(distance_nm(waypoint, area) < 10.0 for waypoint in waypoints):
-            covered_count += 1
-    
-    return covered_count / len(high_prob_areas)
+    # Check if any waypoint is within search range of each area
+    return float(_coverage_mask(high_prob_areas, waypoints).mean())
 
-def calculate_total_coverage(routes: List[OptimizedRoute], high_prob_areas: List[Coordinate]) -> float:
+def calculate_total_coverage(routes: List[OptimizedRoute], high_prob_areas: CoordArray) -> float:
     """Calculate overall coverage percentage across all routes"""
     if not high_prob_areas:
         return 1.0
@@ -258,24 +399,26 @@ def calculate_total_coverage(routes: List[OptimizedRoute], high_prob_areas: List
     for route in routes:
         all_waypoints.extend(route.waypoints)
     
-    return calculate_probability_covered(all_waypoints, high_prob_areas)
+    return calculate_probability_covered(CoordArray.from_coordinates(all_waypoints), high_prob_areas)
 
-def identify_uncovered_areas(high_prob_areas: List[Coordinate], covered_waypoints: List[Coordinate]) -> List[dict]:
+def identify_uncovered_areas(high_prob_areas: CoordArray, covered_waypoints: CoordArray) -> List[dict]:
     """Identify high-probability areas that remain uncovered"""
     uncovered = []
-    
-    for area in high_prob_areas:
-        if not any(distance_nm(area, waypoint) < 10.0 for waypoint in covered_waypoints):
-            uncovered.append({
-                "type": "Feature",
-                "geometry": {
-                    "type": "Point",
-                    "coordinates": [area.lon, area.lat]
-                },
-                "properties": {
-                    "priority": "high",
-                    "reason": "insufficient_asset_coverage"
-                }
-            })
+    if not high_prob_areas:
+        return uncovered
+    
+    uncovered_areas = high_prob_areas.subset(~_coverage_mask(high_prob_areas, covered_waypoints))
+    for lat, lon in zip(uncovered_areas.lats.tolist(), uncovered_areas.lons.tolist()):
+        uncovered.append({
+            "type": "Feature",
+            "geometry": {
+                "type": "Point",
+                "coordinates": [lon, lat]
+            },
+            "properties": {
+                "priority": "high",
+                "reason": "insufficient_asset_coverage"
+            }
+        })
     
     return uncovered
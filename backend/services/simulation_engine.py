@@ -1,15 +1,49 @@
 import numpy as np
 import math
 from scipy.stats import gaussian_kde
-from shapely.geometry import Point, MultiPoint, Polygon
+from scipy.signal import fftconvolve
+from scipy.interpolate import RegularGridInterpolator
+from scipy.spatial import ConvexHull, Delaunay
+from shapely.geometry import MultiPoint, MultiLineString
+from shapely.ops import polygonize, unary_union
 from schemas.telemetry import TelemetryInput
 import asyncio
 
+try:
+    from numba import njit
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+    
+    def njit(*args, **kwargs):
+        """No-op stand-in so the kernels below run as plain Python"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+try:
+    import alphashape
+    _HAS_ALPHASHAPE = True
+except ImportError:
+    _HAS_ALPHASHAPE = False
+
 # Constants
 KNOTS_TO_MPS = 0.514444  # Knots to m/s conversion
 EARTH_RADIUS = 6371000  # Earth radius in meters
+METERS_PER_DEGREE = EARTH_RADIUS * math.pi / 180  # ≈ 111195 m of latitude
 FUEL_FLOW_RATE = 0.8  # kg/s (typical jet fuel consumption)
 
+# Cells per axis of the binned KDE grid. Spacing stays a small fraction of the
+# Scott bandwidth for Monte Carlo batch sizes in the thousands.
+KDE_GRID_SIZE = 128
+
+# Below this many samples the exact pairwise KDE is cheaper than the grid
+KDE_EXACT_MAX_POINTS = 1000
+
+def _new_rng() -> np.random.Generator:
+    """Fresh lock-free PCG64DXSM generator; one per simulation request"""
+    return np.random.Generator(np.random.PCG64DXSM())
+
 async def run_simulation(telemetry: TelemetryInput, n_simulations=1000) -> dict:
     """
     Run realistic crash zone prediction simulation:
@@ -17,7 +51,14 @@ async def run_simulation(telemetry: TelemetryInput, n_simulations=1000) -> dict:
     2. Wind drift modeling
     3. Fuel consumption modeling
     4. Bayesian probability estimation
+    
+    The CPU-bound work runs in a worker thread so the event loop keeps
+    serving other requests and external API fetches meanwhile.
     """
+    return await asyncio.to_thread(simulate_crash_zones, telemetry, n_simulations)
+
+def simulate_crash_zones(telemetry: TelemetryInput, n_simulations=1000) -> dict:
+    """Synchronous body of run_simulation; pure CPU work with no awaits"""
     # Convert inputs to metric
     airspeed_mps = telemetry.speed * KNOTS_TO_MPS
     wind_speed_mps = telemetry.wind.speed * KNOTS_TO_MPS
@@ -27,22 +68,20 @@ async def run_simulation(telemetry: TelemetryInput, n_simulations=1000) -> dict:
         telemetry.lat, 
         telemetry.lon, 
         n_simulations,
-        telemetry.altitude
+        telemetry.altitude,
+        rng=_new_rng()
     )
     
     # Run Monte Carlo simulations
-    crash_points = []
-    for i in range(n_simulations):
-        point = await simulate_flight(
-            start_positions[i],
-            telemetry.heading,
-            airspeed_mps,
-            wind_speed_mps,
-            telemetry.wind.direction,
-            telemetry.fuel,
-            telemetry.time_since_contact
-        )
-        crash_points.append(point)
+    crash_points = simulate_flight_batch(
+        start_positions,
+        telemetry.heading,
+        airspeed_mps,
+        wind_speed_mps,
+        telemetry.wind.direction,
+        telemetry.fuel,
+        telemetry.time_since_contact
+    )
     
     # Calculate probability density
     probabilities = calculate_probability_density(crash_points)
@@ -52,22 +91,23 @@ async def run_simulation(telemetry: TelemetryInput, n_simulations=1000) -> dict:
     
     return zones
 
-def generate_start_positions(lat, lon, n, altitude):
+def generate_start_positions(lat, lon, n, altitude, rng=None):
     """Generate initial positions with uncertainty based on altitude"""
     # Position uncertainty increases with altitude
     uncertainty_m = max(100, altitude / 100)  # 1m per 100ft altitude
-    uncertainty_deg = uncertainty_m / (EARTH_RADIUS * math.pi / 180)
-    
-    return [
-        (
-            lat + np.random.normal(0, uncertainty_deg),
-            lon + np.random.normal(0, uncertainty_deg / math.cos(math.radians(lat)))
-        ) for _ in range(n)
-    ]
-
-async def simulate_flight(start_pos, heading, airspeed, wind_speed, wind_dir, fuel, time_since_contact):
-    """Simulate flight path with wind drift and fuel consumption"""
-    lat, lon = start_pos
+    uncertainty_deg = uncertainty_m / METERS_PER_DEGREE
+    
+    # Draw all offsets in one batch; rows are (lat, lon)
+    if rng is None:
+        rng = _new_rng()
+    # Longitude degrees shrink with latitude; the scale is shared by all samples
+    lon_scale = uncertainty_deg / math.cos(math.radians(lat))
+    dlat = rng.normal(0.0, uncertainty_deg, n)
+    dlon = rng.normal(0.0, lon_scale, n)
+    return np.stack([lat + dlat, lon + dlon], axis=1)
+
+def simulate_flight_batch(start_positions, heading, airspeed, wind_speed, wind_dir, fuel, time_since_contact):
+    """Simulate flight paths with wind drift and fuel consumption for every start position"""
     heading_rad = math.radians(heading)
     
     # Convert wind to components
@@ -89,96 +129,185 @@ async def simulate_flight(start_pos, heading, airspeed, wind_speed, wind_dir, fu
     distance_n = ground_n * max_flight_time
     distance_e = ground_e * max_flight_time
     
-    # Convert to degrees (approx)
-    delta_lat = distance_n / (EARTH_RADIUS * math.pi / 180)
-    delta_lon = distance_e / (EARTH_RADIUS * math.pi / 180 * math.cos(math.radians(lat)))
+    # Convert to degrees (approx); only the longitude scale depends on the sample
+    delta_lat = distance_n / METERS_PER_DEGREE
+    delta_lon_equator = distance_e / METERS_PER_DEGREE
     
-    return (lat + delta_lat, lon + delta_lon)
+    return _displace_batch(
+        np.ascontiguousarray(start_positions, dtype=np.float64),
+        delta_lat,
+        delta_lon_equator
+    )
+
+@njit(cache=True, fastmath=True, nogil=True)
+def _displace_batch(start_positions, delta_lat, delta_lon_equator):
+    """
+    Shift every (lat, lon) start position by the shared flight displacement.
+    
+    Returns:
+        (n_samples, 2) array of (lat, lon) crash positions
+    """
+    n = start_positions.shape[0]
+    out = np.empty((n, 2))
+    for i in range(n):
+        lat = start_positions[i, 0]
+        out[i, 0] = lat + delta_lat
+        out[i, 1] = start_positions[i, 1] + delta_lon_equator / math.cos(math.radians(lat))
+    return out
 
 def calculate_probability_density(points):
-    """Calculate probability density using Gaussian KDE"""
-    lats, lons = zip(*points)
-    positions = np.vstack([lons, lats])
+    """
+    Calculate probability density using Gaussian KDE.
+    
+    Samples are binned onto a KDE_GRID_SIZE grid and convolved with the
+    gaussian_kde kernel via FFT, then read back at each sample by bilinear
+    interpolation. This replaces the O(n^2) pairwise evaluation for
+    batches larger than KDE_EXACT_MAX_POINTS.
+    """
+    # (lat, lon) rows to the (2, n) lon/lat layout gaussian_kde expects
+    positions = np.asarray(points, dtype=float)[:, ::-1].T
     kde = gaussian_kde(positions)
-    return kde(positions)
+    if positions.shape[1] <= KDE_EXACT_MAX_POINTS:
+        return kde(positions)
+    
+    # Bin samples; cell centres are the grid nodes the density is evaluated on
+    lo = positions.min(axis=1)
+    hi = positions.max(axis=1)
+    step = (hi - lo) / (KDE_GRID_SIZE - 1)
+    edges = [np.linspace(lo[d] - step[d] / 2, hi[d] + step[d] / 2, KDE_GRID_SIZE + 1) for d in range(2)]
+    counts, _, _ = np.histogram2d(positions[0], positions[1], bins=edges)
+    
+    # Gaussian kernel with the KDE covariance, sampled at every grid offset
+    offsets = np.arange(-(KDE_GRID_SIZE - 1), KDE_GRID_SIZE)
+    dx, dy = np.meshgrid(offsets * step[0], offsets * step[1], indexing='ij')
+    inv_cov = kde.inv_cov
+    mahalanobis = inv_cov[0, 0] * dx**2 + 2 * inv_cov[0, 1] * dx * dy + inv_cov[1, 1] * dy**2
+    kernel = np.exp(-0.5 * mahalanobis) / (2 * np.pi * np.sqrt(np.linalg.det(kde.covariance)))
+    
+    grid_density = fftconvolve(counts, kernel, mode='same') / positions.shape[1]
+    nodes = [lo[d] + step[d] * np.arange(KDE_GRID_SIZE) for d in range(2)]
+    interpolator = RegularGridInterpolator(nodes, np.maximum(grid_density, 0.0), bounds_error=False, fill_value=None)
+    return interpolator(positions.T)
 
 def generate_probability_zones(points, probabilities, levels=[0.95, 0.75, 0.50]):
     """Generate probability zones using alpha shapes"""
+    if not _HAS_ALPHASHAPE:
+        # Fallback implementation without alphashape
+        return generate_simple_probability_zones(points, probabilities, levels)
+    
+    # Rank (lon, lat) points from most to least probable
+    ranked_points = np.asarray(points)[:, ::-1][np.argsort(-np.asarray(probabilities), kind='stable')]
+    level_sizes = [int(len(ranked_points) * level) for level in levels]
+    
+    # Generate alpha shapes for all probability levels from one triangulation
     try:
-        from scipy.spatial import Delaunay
-        import alphashape
-        
-        # Create weighted point cloud
-        weighted_points = []
-        max_prob = np.max(probabilities)
-        for i, (lat, lon) in enumerate(points):
-            weight = int(100 * probabilities[i] / max_prob)
-            weighted_points.extend([(lon, lat)] * weight)
-        
-        # Generate alpha shapes for probability levels
-        zones = []
-        for level in levels:
-            # Select top probability points
-            n_points = int(len(weighted_points) * level)
-            selected_points = weighted_points[:n_points]
-            
-            if len(selected_points) < 3:
-                continue
-                
-            # Generate concave hull (alpha shape)
-            try:
-                alpha = alphashape.optimize(selected_points)
-                hull = alphashape.alphashape(selected_points, alpha)
-                
-                # Convert to polygon
-                if hull and hull.geom_type == 'Polygon':
-                    coords = list(hull.exterior.coords)
-                    zones.append({
-                        "coordinates": coords,
-                        "probability": level,
-                        "area_km2": calculate_zone_area(coords)
-                    })
-            except Exception as e:
-                # Fallback to convex hull if alpha shape fails
-                from scipy.spatial import ConvexHull
-                if len(selected_points) >= 3:
-                    hull = ConvexHull(selected_points)
-                    coords = [(selected_points[i][0], selected_points[i][1]) for i in hull.vertices]
-                    coords.append(coords[0])  # Close polygon
-                    zones.append({
-                        "coordinates": coords,
-                        "probability": level,
-                        "area_km2": calculate_zone_area(coords)
-                    })
+        widest_points = ranked_points[:max(level_sizes)]
+        alpha = alphashape.optimizealpha(widest_points)
+        hulls = _nested_alpha_shapes(widest_points, level_sizes, alpha)
+    except Exception as e:
+        hulls = [None] * len(levels)
+    
+    zones = []
+    for level, n_points, hull in zip(levels, level_sizes, hulls):
+        # Select top probability points
+        selected_points = ranked_points[:n_points]
         
-        return zones
+        if len(selected_points) < 3:
+            continue
         
-    except ImportError:
-        # Fallback implementation without alphashape
-        return generate_simple_probability_zones(points, probabilities, levels)
+        if hull is not None and not hull.is_empty and hull.geom_type == 'Polygon':
+            # Convert concave hull (alpha shape) to polygon
+            coords = list(hull.exterior.coords)
+        else:
+            # Fallback to convex hull if the alpha shape failed, split or came back empty
+            hull = ConvexHull(selected_points)
+            coords = [(selected_points[i][0], selected_points[i][1]) for i in hull.vertices]
+            coords.append(coords[0])  # Close polygon
+        zones.append({
+            "coordinates": coords,
+            "probability": level,
+            "area_km2": calculate_zone_area(coords)
+        })
+    
+    return zones
+
+def _nested_alpha_shapes(ranked_points, sizes, alpha):
+    """
+    Alpha shapes of the top-k prefixes of ranked_points, one per size.
+    
+    A single Delaunay triangulation of the full point set is filtered per
+    prefix: a triangle belongs to prefix k when all of its vertices rank
+    below k and its circumradius passes the 1/alpha test, as in
+    alphashape.alphashape. The shape is polygonized from the boundary edges.
+    
+    The shared triangulation lacks edges a prefix's own triangulation would
+    have, so its prefix shapes can come out tighter and split apart. A prefix
+    whose shape is not a single Polygon is triangulated again on its own.
+    
+    Returns:
+        List of shapely geometries aligned with sizes
+    """
+    if len(ranked_points) < 4 or alpha <= 0:
+        # alphashape returns the convex hull here; do the same per prefix
+        return [MultiPoint(ranked_points[:k].tolist()).convex_hull for k in sizes]
+    
+    triangles, passes_alpha = _alpha_triangles(ranked_points, alpha)
+    last_vertex = triangles.max(axis=1)
+    
+    shapes = []
+    for k in sizes:
+        if k < 4:
+            shapes.append(MultiPoint(ranked_points[:k].tolist()).convex_hull)
+            continue
+        shape = _polygonize_triangles(ranked_points, triangles[passes_alpha & (last_vertex < k)])
+        if shape.geom_type != 'Polygon' and k < len(ranked_points):
+            prefix_triangles, prefix_passes = _alpha_triangles(ranked_points[:k], alpha)
+            shape = _polygonize_triangles(ranked_points, prefix_triangles[prefix_passes])
+        shapes.append(shape)
+    return shapes
+
+def _alpha_triangles(points, alpha):
+    """Delaunay triangles of points and whether each passes the 1/alpha circumradius test"""
+    triangles = Delaunay(points).simplices
+    a, b, c = (points[triangles[:, i]] for i in range(3))
+    ab = np.linalg.norm(b - a, axis=1)
+    bc = np.linalg.norm(c - b, axis=1)
+    ca = np.linalg.norm(a - c, axis=1)
+    twice_area = np.abs((b - a)[:, 0] * (c - a)[:, 1] - (b - a)[:, 1] * (c - a)[:, 0])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        circumradius = ab * bc * ca / (2 * twice_area)
+    return triangles, circumradius < 1.0 / alpha
+
+def _polygonize_triangles(points, triangles):
+    """Union of the triangles, polygonized from their perimeter edges"""
+    # Perimeter edges belong to exactly one kept triangle
+    edges = np.sort(np.concatenate([triangles[:, [0, 1]], triangles[:, [1, 2]], triangles[:, [2, 0]]]), axis=1)
+    unique_edges, counts = np.unique(edges, axis=0, return_counts=True)
+    perimeter = points[unique_edges[counts == 1]]
+    return unary_union(list(polygonize(MultiLineString(list(perimeter)))))
 
 def generate_simple_probability_zones(points, probabilities, levels):
     """Fallback method using simple statistical zones"""
     zones = []
+    positions = np.asarray(points, dtype=float)
     
-    # Calculate center point
-    center_lat = np.mean([p[0] for p in points])
-    center_lon = np.mean([p[1] for p in points])
+    # Calculate center point and standard deviations, columns are (lat, lon)
+    center_lat, center_lon = positions.mean(axis=0)
+    std_lat, std_lon = positions.std(axis=0)
     
-    # Calculate standard deviations
-    std_lat = np.std([p[0] for p in points])
-    std_lon = np.std([p[1] for p in points])
+    angles = np.linspace(0, 2*np.pi, 20)
+    sin_angles = np.sin(angles)
+    cos_angles = np.cos(angles)
     
     for level in levels:
         # Create elliptical zones based on probability level
         radius_factor = 1.0 / level  # Higher probability = smaller radius
         
         # Generate ellipse points
-        coords = []
-        for angle in np.linspace(0, 2*np.pi, 20):
-            lat = center_lat + radius_factor * std_lat * np.sin(angle)
-            lon = center_lon + radius_factor * std_lon * np.cos(angle)
-            coords.append([lon, lat])
+        coords = np.column_stack([
+            center_lon + radius_factor * std_lon * cos_angles,
+            center_lat + radius_factor * std_lat * sin_angles
+        ]).tolist()
         coords.append(coords[0])  # Close polygon
         
         zones.append({
@@ -190,13 +319,12 @@ def generate_simple_probability_zones(points, probabilities, levels):
     return zones
 
 def calculate_zone_area(coordinates):
-    """Calculate approximate area of a polygon in km²"""
-    try:
-        from shapely.geometry import Polygon
-        polygon = Polygon(coordinates)
-        # Rough conversion from degrees² to km²
-        area_deg2 = polygon.area
-        area_km2 = area_deg2 * (111.32 ** 2)  # 1 degree ≈ 111.32 km
-        return round(area_km2, 2)
-    except:
-        return 0.0
\ No newline at end of file
+    """Calculate approximate area of a polygon in km² (shoelace formula)"""
+    ring = np.asarray(coordinates, dtype=float)
+    if ring.ndim != 2 or len(ring) < 3:
+        return 0.0
+    x, y = ring[:, 0], ring[:, 1]
+    area_deg2 = 0.5 * abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+    # Rough conversion from degrees² to km²
+    area_km2 = area_deg2 * (111.32 ** 2)  # 1 degree ≈ 111.32 km
+    return round(float(area_km2), 2)
\ No newline at end of file
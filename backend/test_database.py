@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the SQLite database manager
+
+Run with: python -m pytest test_database.py
+"""
+
+import asyncio
+import math
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services import database_manager
+from services.database_manager import SARDatabase, engineer_features_batch
+
+@pytest.fixture
+def db(tmp_path):
+    """Fresh database in a temporary directory"""
+    database = SARDatabase(str(tmp_path / "sar_test.db"))
+    yield database
+    database.close()
+
+class _CountingLock:
+    """Lock wrapper recording how often it is acquired"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.acquisitions = 0
+    
+    def __enter__(self):
+        self._lock.acquire()
+        self.acquisitions += 1
+        return self
+    
+    def __exit__(self, *exc_info):
+        self._lock.release()
+    
+    def locked(self):
+        return self._lock.locked()
+
+def _baseline_is_over_ocean(lat, lon):
+    """The original strict-comparison ocean test"""
+    atlantic = (-70 < lon < 20 and 0 < lat < 70)
+    pacific = (-180 < lon < -70 and -60 < lat < 70)
+    indian = (20 < lon < 120 and -60 < lat < 30)
+    return atlantic or pacific or indian
+
+@pytest.mark.parametrize("lat, lon", [
+    (0, -30), (0, 0), (10, 20), (-60, -100), (15, -70), (70, 0), (30, 50),
+    (45, 120), (-20, -180), (0.5, -30.5), (10.5, 19.5), (-59.5, -100.5),
+    (89.9, 179.9), (-90, 0), (95, 0), (10, -190), (10, 185),
+    (math.nan, 0), (0, math.nan), (math.inf, 10)
+])
+def test_ocean_bitmap_matches_strict_comparisons(lat, lon):
+    database = SARDatabase.__new__(SARDatabase)  # _is_over_ocean needs no connection
+    assert database._is_over_ocean(lat, lon) == _baseline_is_over_ocean(lat, lon)
+
+def _baseline_engineer_features(data_point):
+    """The original per-row SARDatabase._engineer_features"""
+    features = {}
+    if data_point.get('time_since_contact'):
+        features['urgency_score'] = min(1.0, data_point['time_since_contact'] / 3600)
+    lat, elevation = data_point.get('aircraft_lat', 0), data_point.get('elevation', 0)
+    features['geographic_complexity'] = min(1.0, elevation / 3000) * 0.7 + abs(lat) / 90.0 * 0.3
+    wind_speed = data_point.get('wind_speed', 0)
+    visibility = data_point.get('visibility', 10000)
+    temperature = data_point.get('temperature', 20)
+    features['weather_severity'] = (min(1.0, wind_speed / 25) * 0.5
+                                    + max(0, (10000 - visibility) / 10000) * 0.3
+                                    + max(abs(temperature - 20), 0) / 40 * 0.2)
+    if data_point.get('aircraft_velocity') and data_point.get('fuel_remaining'):
+        features['endurance_ratio'] = data_point['fuel_remaining'] / max(1, data_point['aircraft_velocity'])
+    summary_stats = data_point.get('summary_stats', {})
+    if isinstance(summary_stats, dict):
+        features['search_complexity'] = (summary_stats.get('total_area_km2', 0)
+                                         / max(1, summary_stats.get('primary_search_zones', 1)))
+    return features
+
+def test_batch_features_match_baseline_per_row():
+    rng = np.random.default_rng(7)
+    rows = []
+    for i in range(500):
+        rows.append({
+            'time_since_contact': [0, 1800, 7200.5][i % 3],
+            'aircraft_lat': float(rng.uniform(-90, 90)),
+            'elevation': float(rng.uniform(-50, 5000)),
+            'wind_speed': float(rng.uniform(0, 40)),
+            'visibility': float(rng.uniform(0, 12000)),
+            'temperature': float(rng.uniform(-40, 45)),
+            'aircraft_velocity': [0, 0.5, 250.0][i % 3],
+            'fuel_remaining': [3000.0, 0, 1200.0][i % 3],
+            'summary_stats': [{'total_area_km2': 812.4, 'primary_search_zones': 3}, {}, None][i % 3]
+        })
+    
+    batch = engineer_features_batch(pd.DataFrame(rows))
+    
+    for i, row in enumerate(rows):
+        expected = _baseline_engineer_features(row)
+        for name, value in batch.iloc[i].items():
+            if name in expected:
+                assert value == pytest.approx(expected[name], rel=1e-12, abs=1e-12)
+            else:
+                assert math.isnan(value)
+
+def _plain_round_trip(db_path: str):
+    """Insert and read every trig table through a connection without the UDFs"""
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("INSERT INTO aircraft_telemetry (id, heading) VALUES ('plain', 45)")
+        conn.execute("INSERT INTO environmental_data (id, wind_direction) VALUES ('plain', 45)")
+        conn.commit()
+        conn.execute("SELECT * FROM aircraft_telemetry").fetchall()
+        conn.execute("SELECT * FROM environmental_data").fetchall()
+        hidden = [row[1] for row in conn.execute("PRAGMA table_xinfo(aircraft_telemetry)") if row[6]]
+        assert hidden == []
+    finally:
+        conn.close()
+
+def test_trig_columns_filled_and_plain_connection_usable(db):
+    db.store_aircraft_data({
+        'icao24': 'abc123', 'timestamp': 1, 'lat': 10.0, 'lon': 20.0,
+        'altitude': 1000, 'speed': 200, 'heading': 90
+    })
+    db.store_environmental_data(10.0, 20.0, {'wind_direction': 180})
+    
+    _plain_round_trip(db.db_path)
+    
+    conn = sqlite3.connect(db.db_path)
+    heading_sin, heading_cos = conn.execute(
+        "SELECT heading_sin, heading_cos FROM aircraft_telemetry WHERE icao24 = 'abc123'"
+    ).fetchone()
+    wind_sin, wind_cos = conn.execute(
+        "SELECT wind_direction_sin, wind_direction_cos FROM environmental_data WHERE id != 'plain'"
+    ).fetchone()
+    conn.close()
+    assert heading_sin == pytest.approx(1.0) and heading_cos == pytest.approx(0.0, abs=1e-12)
+    assert wind_sin == pytest.approx(0.0, abs=1e-12) and wind_cos == pytest.approx(-1.0)
+
+def test_generated_trig_columns_migrated(tmp_path):
+    db_path = str(tmp_path / "legacy.db")
+    SARDatabase(db_path).close()
+    
+    # Recreate the earlier schema: generated columns over module-registered UDFs
+    conn = sqlite3.connect(db_path)
+    conn.create_function("sin_deg", 1, database_manager._sin_deg, deterministic=True)
+    conn.create_function("cos_deg", 1, database_manager._cos_deg, deterministic=True)
+    conn.execute("INSERT INTO aircraft_telemetry (id, heading) VALUES ('legacy', 90)")
+    for table, column, function, source in database_manager.TRIG_COLUMNS:
+        conn.execute(f"ALTER TABLE {table} DROP COLUMN {column}")
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} REAL "
+                     f"GENERATED ALWAYS AS ({function}({source})) VIRTUAL")
+    conn.commit()
+    conn.close()
+    
+    with pytest.raises(sqlite3.OperationalError):
+        sqlite3.connect(db_path).execute("SELECT * FROM aircraft_telemetry").fetchall()
+    
+    SARDatabase(db_path).close()
+    
+    _plain_round_trip(db_path)
+    conn = sqlite3.connect(db_path)
+    heading_sin = conn.execute(
+        "SELECT heading_sin FROM aircraft_telemetry WHERE id = 'legacy'"
+    ).fetchone()[0]
+    conn.close()
+    assert heading_sin == pytest.approx(1.0)
+
+def test_delete_in_batches_takes_write_lock_per_batch(db):
+    with db._get_connection(write=True) as conn:
+        conn.executemany(
+            "INSERT INTO simulation_results (id, created_at) VALUES (?, ?)",
+            [(f"sim{i}", "2000-01-01T00:00:00") for i in range(25)]
+        )
+        conn.commit()
+    
+    lock = _CountingLock()
+    db._write_lock = lock
+    deleted = db._delete_in_batches("simulation_results", "created_at < ?", ("2001-01-01",), batch_size=10)
+    
+    assert deleted == 25
+    assert lock.acquisitions == 4  # Three batches plus the empty final check
+    assert not lock.locked()
+
+def test_put_wind_cache_prunes_expired_entries(db):
+    db.put_wind_cache(10.0, 20.0, 5.0, 90.0, ttl_seconds=-60)
+    db.put_wind_cache(11.0, 21.0, 6.0, 180.0, ttl_seconds=-60)
+    assert db.get_wind_cache(10.0, 20.0) is None
+    
+    db.put_wind_cache(12.0, 22.0, 7.0, 270.0, ttl_seconds=3600)
+    
+    with db._get_connection() as conn:
+        rows = conn.execute("SELECT lat_cell FROM wind_cache").fetchall()
+    assert [row['lat_cell'] for row in rows] == [12000]
+    assert db.get_wind_cache(12.0, 22.0)[:2] == (7.0, 270.0)
+
+def test_cleanup_purges_expired_wind_cache(db):
+    now = time.time()
+    with db._get_connection(write=True) as conn:
+        conn.executemany(
+            "INSERT INTO wind_cache (lat_cell, lon_cell, wind_speed, wind_direction, expires_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(i, i, 5.0, 90.0, now - 60) for i in range(7)] + [(100, 100, 5.0, 90.0, now + 3600)]
+        )
+        conn.commit()
+    
+    dry_run = asyncio.run(db.cleanup_old_data(dry_run=True))
+    assert dry_run['wind_cache_records_to_delete'] == 7
+    
+    summary = asyncio.run(db.cleanup_old_data(dry_run=False))
+    assert summary['wind_cache_records_deleted'] == 7
+    with db._get_connection() as conn:
+        remaining = conn.execute("SELECT lat_cell FROM wind_cache").fetchall()
+    assert [row['lat_cell'] for row in remaining] == [100]
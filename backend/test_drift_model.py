@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Parity tests for the wind drift model against the original scalar implementation
+
+Run with: python -m pytest test_drift_model.py
+"""
+
+import asyncio
+import math
+
+import numpy as np
+import pytest
+from scipy.stats import gaussian_kde
+
+from schemas.telemetry import TelemetryInput, WindData
+from services import drift_model
+from services.drift_model import EARTH_RADIUS_M, KNOTS_TO_MPS, WindDriftModel
+
+METERS_PER_DEGREE = EARTH_RADIUS_M * math.pi / 180
+
+# (altitude ft, seconds since contact, object type): descent only, descent then
+# surface drift, surface only, and runs cut short by the time limit
+SCENARIOS = [
+    (35000, 900, "debris"),
+    (35000, 200000, "survival_raft"),
+    (0, 7300, "debris"),
+    (1000, 30, "debris"),
+    (5000, 0, "debris"),
+    (45000, 86400, "fuselage"),
+    (12000, 40000, "cargo"),
+]
+
+def _baseline_wind_at_altitude(altitude_ft, speed, direction):
+    """The original if/elif wind shear model"""
+    altitude_m = altitude_ft * 0.3048
+    if altitude_m < 1000:
+        wind_factor, direction_shift = 0.7, 0
+    elif altitude_m < 5000:
+        wind_factor, direction_shift = 0.7 + (altitude_m - 1000) / 4000 * 0.5, 15
+    elif altitude_m < 12000:
+        wind_factor, direction_shift = 1.2 + (altitude_m - 5000) / 7000 * 0.8, 30
+    else:
+        wind_factor, direction_shift = 2.0 + min((altitude_m - 12000) / 8000, 1.0) * 1.5, 45
+    return speed * wind_factor, (direction + direction_shift) % 360
+
+def _baseline_drift_path(lat, lon, altitude_ft, speed, direction, time_seconds, object_type):
+    """The original step-by-step descent and surface drift loops"""
+    model = WindDriftModel()
+    descent_rate = model._get_descent_rate(object_type, altitude_ft)
+    drag_coefficient = model._get_drag_coefficient(object_type)
+    positions = [(lat, lon)]
+    altitude, total_time, dt = altitude_ft, 0, 60
+    
+    while altitude > 0 and total_time < time_seconds:
+        step_speed, step_direction = _baseline_wind_at_altitude(altitude, speed, direction)
+        speed_mps = step_speed * KNOTS_TO_MPS
+        direction_rad = math.radians(step_direction)
+        density = math.exp(-altitude * 0.3048 / 8400)
+        north = speed_mps * math.cos(direction_rad) * drag_coefficient * density * dt
+        east = speed_mps * math.sin(direction_rad) * drag_coefficient * density * dt
+        lon_step = east / (METERS_PER_DEGREE * math.cos(math.radians(lat)))
+        lat += north / METERS_PER_DEGREE
+        lon += lon_step
+        altitude -= descent_rate * dt
+        total_time += dt
+        positions.append((lat, lon))
+    
+    if altitude <= 0 and total_time < time_seconds:
+        surface_factor = 0.05 if object_type == "survival_raft" else 0.03
+        speed_mps = speed * KNOTS_TO_MPS * surface_factor
+        direction_rad = math.radians(direction)
+        deflection = 2 * 7.2921e-5 * math.sin(math.radians(lat)) * 3600
+        for step in range(int((time_seconds - total_time) // 3600)):
+            north = speed_mps * math.cos(direction_rad)
+            east = speed_mps * math.sin(direction_rad)
+            if step > 0:
+                north, east = (north * math.cos(deflection) - east * math.sin(deflection),
+                               north * math.sin(deflection) + east * math.cos(deflection))
+            lon_step = east * 3600 / (METERS_PER_DEGREE * math.cos(math.radians(lat)))
+            lat += north * 3600 / METERS_PER_DEGREE
+            lon += lon_step
+            positions.append((lat, lon))
+    
+    return np.array(positions)
+
+def _wind_samples(seed, n=25):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0, 150, n), rng.uniform(0, 359.9, n)
+
+@pytest.mark.parametrize("altitude_ft", np.linspace(0, 80000, 161).tolist() + [3280.84, 16404.2, 39370.08])
+def test_wind_shear_tables_match_baseline(altitude_ft):
+    wind = WindData(speed=42.0, direction=350.0)
+    speed, direction = WindDriftModel()._get_wind_at_altitude(altitude_ft, wind)
+    expected_speed, expected_direction = _baseline_wind_at_altitude(altitude_ft, 42.0, 350.0)
+    assert speed == pytest.approx(expected_speed, rel=1e-12)
+    assert direction == pytest.approx(expected_direction, rel=1e-12)
+
+@pytest.mark.parametrize("altitude_ft, time_seconds, object_type", SCENARIOS)
+def test_drift_path_matches_baseline(altitude_ft, time_seconds, object_type):
+    model = WindDriftModel()
+    for speed, direction in zip(*_wind_samples(seed=1, n=5)):
+        path = asyncio.run(model.calculate_drift_vectors(
+            40.0, -30.0, altitude_ft, WindData(speed=speed, direction=direction), time_seconds, object_type
+        ))
+        expected = _baseline_drift_path(40.0, -30.0, altitude_ft, speed, direction, time_seconds, object_type)
+        np.testing.assert_allclose(np.array(path), expected, rtol=0, atol=1e-9)
+
+@pytest.mark.parametrize("compiled", [True, False])
+@pytest.mark.parametrize("altitude_ft, time_seconds, object_type", SCENARIOS)
+def test_final_positions_batch_matches_baseline(monkeypatch, compiled, altitude_ft, time_seconds, object_type):
+    if compiled and not drift_model._HAS_NUMBA:
+        pytest.skip("numba not installed")
+    monkeypatch.setattr(drift_model, "_HAS_NUMBA", compiled)
+    speeds, directions = _wind_samples(seed=2)
+    
+    lats, lons = WindDriftModel().calculate_final_positions_batch(
+        40.0, -30.0, altitude_ft, speeds, directions, time_seconds, object_type
+    )
+    
+    expected = np.array([
+        _baseline_drift_path(40.0, -30.0, altitude_ft, speed, direction, time_seconds, object_type)[-1]
+        for speed, direction in zip(speeds, directions)
+    ])
+    # Per-step work arrays are float32 (DRIFT_DTYPE); totals stay within ~0.2 m
+    np.testing.assert_allclose(lats, expected[:, 0], rtol=0, atol=2e-6)
+    np.testing.assert_allclose(lons, expected[:, 1], rtol=0, atol=2e-6)
+
+def test_drift_probabilities_match_pointwise_kde(monkeypatch):
+    monkeypatch.setattr(drift_model, "KDE_EVAL_CHUNK", 64)  # Several chunks for 300 samples
+    telemetry = TelemetryInput(lat=40.0, lon=-30.0, altitude=35000, speed=450, heading=90, fuel=4000,
+                               wind=WindData(speed=30, direction=250), time_since_contact=7200)
+    np.random.seed(3)
+    
+    result = asyncio.run(drift_model.calculate_wind_drift_probability(telemetry, n_simulations=300))
+    
+    lats, lons, probabilities = (np.array(column) for column in zip(*result))
+    kde = gaussian_kde(np.vstack([lons, lats]))
+    expected = [kde.evaluate([[lon], [lat]])[0] for lat, lon in zip(lats, lons)]
+    np.testing.assert_allclose(probabilities, expected, rtol=1e-10)
+
+@pytest.mark.parametrize("lat, object_type", [(62.0, "survival_raft"), (-48.0, "debris"), (0.0, "debris")])
+def test_long_surface_drift_matches_baseline(lat, object_type):
+    # A month of hourly surface steps: the rotated components accumulate by cumsum
+    wind = WindData(speed=25.0, direction=200.0)
+    path = WindDriftModel().calculate_drift_path(lat, -30.0, 0, wind, 30 * 86400, object_type)
+    expected = _baseline_drift_path(lat, -30.0, 0, 25.0, 200.0, 30 * 86400, object_type)
+    np.testing.assert_allclose(path, expected, rtol=0, atol=1e-9)
+
+def test_drift_vectors_convert_array_path_at_boundary():
+    model = WindDriftModel()
+    wind = WindData(speed=30.0, direction=45.0)
+    
+    path = model.calculate_drift_path(40.0, -30.0, 35000, wind, 86400, "survival_raft")
+    vectors = asyncio.run(model.calculate_drift_vectors(40.0, -30.0, 35000, wind, 86400, "survival_raft"))
+    
+    assert isinstance(path, np.ndarray) and path.shape == (len(vectors), 2)
+    assert all(type(point) is tuple and all(type(value) is float for value in point) for point in vectors)
+    assert vectors == [tuple(point) for point in path.tolist()]
+
+@pytest.mark.skipif(not drift_model._HAS_NUMBA, reason="numba not installed")
+def test_parallel_descent_endpoints_match_serial_paths():
+    model = WindDriftModel()
+    speeds, directions = _wind_samples(seed=4, n=64)
+    params = (60.0, model._get_descent_rate("debris", 35000), model._get_drag_coefficient("debris"), 40)
+    
+    endpoints = drift_model._descent_endpoints(40.0, -30.0, 35000.0, speeds, directions, *params)
+    
+    expected = [drift_model._drift_loop.py_func(40.0, -30.0, 35000.0, speed, direction, *params)[-1]
+                for speed, direction in zip(speeds, directions)]
+    np.testing.assert_allclose(endpoints, expected, rtol=0, atol=1e-9)
+
+def test_float32_batch_error_bounded_for_large_batches():
+    speeds, directions = _wind_samples(seed=5, n=2000)
+    
+    lats, lons = WindDriftModel().calculate_final_positions_batch(
+        40.0, -30.0, 35000, speeds, directions, 200000, "survival_raft"
+    )
+    
+    # Float32 work arrays keep every endpoint within ~0.2 m of the float64 loops
+    expected = np.array([
+        _baseline_drift_path(40.0, -30.0, 35000, speed, direction, 200000, "survival_raft")[-1]
+        for speed, direction in zip(speeds, directions)
+    ])
+    assert lats.dtype == np.float64 and lons.dtype == np.float64
+    np.testing.assert_allclose(lats, expected[:, 0], rtol=0, atol=2e-6)
+    np.testing.assert_allclose(lons, expected[:, 1], rtol=0, atol=2e-6)
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Parity tests for the GeoJSON exporter against the original per-vertex implementation
+
+Run with: python -m pytest test_geojson_exporter.py
+"""
+
+import math
+
+import numpy as np
+import pytest
+from shapely.geometry import Polygon
+
+from services import simulation_engine
+from utils import geojson_exporter
+
+def _baseline_haversine(lat1, lon1, lat2, lon2):
+    """The original math-module haversine in km"""
+    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
+    a = math.sin((lat2 - lat1)/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1)/2)**2
+    return 6371.0 * 2 * math.asin(math.sqrt(a))
+
+def _baseline_perimeter(coordinates):
+    """The original edge-by-edge calculate_polygon_perimeter"""
+    if len(coordinates) < 2:
+        return 0.0
+    total = 0.0
+    for i in range(len(coordinates)):
+        p1, p2 = coordinates[i], coordinates[(i + 1) % len(coordinates)]
+        total += _baseline_haversine(p1[1], p1[0], p2[1], p2[0])
+    return round(total, 2)
+
+def _baseline_area(coordinates):
+    """The original shapely-based calculate_polygon_area"""
+    if len(coordinates) < 3:
+        return 0.0
+    return round(Polygon(coordinates).area * (111.32 ** 2), 2)
+
+def _baseline_validate_zone(zone):
+    """The original per-vertex validate_zone"""
+    if not isinstance(zone, dict) or "probability" not in zone or "coordinates" not in zone:
+        return False
+    if not (0 <= zone.get("probability", 0) <= 1):
+        return False
+    coordinates = zone.get("coordinates", [])
+    if not isinstance(coordinates, list) or len(coordinates) < 3:
+        return False
+    try:
+        for coord in coordinates:
+            if not isinstance(coord, (list, tuple)) or len(coord) != 2:
+                return False
+            lon, lat = coord
+            if not (-180 <= lon <= 180) or not (-90 <= lat <= 90):
+                return False
+    except (TypeError, ValueError):
+        return False
+    return True
+
+def _baseline_risk_level(probability):
+    """The original if/elif risk classification"""
+    if probability >= 0.8:
+        return "critical"
+    elif probability >= 0.6:
+        return "high"
+    elif probability >= 0.4:
+        return "medium"
+    elif probability >= 0.2:
+        return "low"
+    return "minimal"
+
+def _baseline_generate_geojson(zones, metadata=None):
+    """The original per-zone generate_geojson, timestamps omitted"""
+    features = []
+    for i, zone in enumerate(sorted(zones, key=lambda z: z.get("probability", 0), reverse=True)):
+        if not _baseline_validate_zone(zone):
+            continue
+        coordinates = zone["coordinates"]
+        properties = {
+            "probability": zone["probability"],
+            "risk_level": _baseline_risk_level(zone["probability"]),
+            "zone_rank": i + 1,
+            "area_km2": _baseline_area(coordinates),
+            "perimeter_km": _baseline_perimeter(coordinates)
+        }
+        if 'area_km2' in zone:
+            properties["calculated_area_km2"] = zone['area_km2']
+        if 'evidence_type' in zone:
+            properties["evidence_type"] = zone['evidence_type']
+        features.append({"type": "Feature", "geometry": {"type": "Polygon", "coordinates": [coordinates]},
+                         "properties": properties})
+    return {
+        "type": "FeatureCollection",
+        "features": features,
+        "properties": {
+            "total_zones": len(features),
+            "max_probability": max([f["properties"]["probability"] for f in features]) if features else 0,
+            "total_area_km2": sum([f["properties"]["area_km2"] for f in features]),
+            "coordinate_system": "WGS84",
+            "simulation_metadata": metadata or {}
+        },
+        "crs": {"type": "name", "properties": {"name": "EPSG:4326"}}
+    }
+
+def _without_timestamps(geojson):
+    del geojson["properties"]["generated_at"]
+    for feature in geojson["features"]:
+        del feature["properties"]["created_at"]
+    return geojson
+
+def _ring(seed, n=12, closed=True):
+    """Irregular (lon, lat) ring around a random centre"""
+    rng = np.random.default_rng(seed)
+    lon, lat = rng.uniform(-170, 170), rng.uniform(-75, 75)
+    angles = np.sort(rng.uniform(0, 2 * np.pi, n))
+    radii = rng.uniform(0.2, 2.0, n)
+    ring = np.column_stack([lon + radii * np.cos(angles), lat + radii * np.sin(angles)]).tolist()
+    return ring + ring[:1] if closed else ring
+
+RINGS = [_ring(seed, n, closed) for seed, n, closed in [(0, 12, True), (1, 3, False), (2, 40, True), (3, 7, False)]] + [
+    [[0, 0], [1, 0], [1, 1], [0, 1], [0, 0]],
+    [[179.5, -10.0], [-179.5, -10.0], [-179.5, 10.0], [179.5, 10.0]],  # Straddles the antimeridian
+    [[0, 0], [2, 0], [1, 0]],  # Degenerate
+    [[10, 10], [11, 11]]
+]
+
+@pytest.mark.parametrize("coordinates", RINGS)
+def test_perimeter_matches_baseline(coordinates):
+    assert geojson_exporter.calculate_polygon_perimeter(coordinates) == _baseline_perimeter(coordinates)
+
+@pytest.mark.parametrize("coordinates", RINGS)
+def test_area_matches_baseline(coordinates):
+    assert geojson_exporter.calculate_polygon_area(coordinates) == _baseline_area(coordinates)
+
+def test_batch_areas_match_baseline():
+    rings = [ring for ring in RINGS if len(ring) >= 3]
+    assert geojson_exporter.calculate_polygon_areas(rings) == [_baseline_area(ring) for ring in rings]
+    assert geojson_exporter.calculate_polygon_areas([]) == []
+
+@pytest.mark.parametrize("compiled", [True, False])
+def test_area_kernels_agree(monkeypatch, compiled):
+    if compiled and not geojson_exporter._HAS_NUMBA:
+        pytest.skip("numba not installed")
+    monkeypatch.setattr(geojson_exporter, "_HAS_NUMBA", compiled)
+    for ring in RINGS:
+        assert geojson_exporter.calculate_polygon_area(ring) == _baseline_area(ring)
+
+def test_haversine_matches_baseline():
+    rng = np.random.default_rng(9)
+    points = np.column_stack([rng.uniform(-90, 90, 400), rng.uniform(-180, 180, 400)]).tolist()
+    for (lat1, lon1), (lat2, lon2) in zip(points[::2], points[1::2]):
+        assert geojson_exporter.haversine_distance(lat1, lon1, lat2, lon2) == pytest.approx(
+            _baseline_haversine(lat1, lon1, lat2, lon2), rel=1e-12, abs=1e-9
+        )
+
+def test_zone_order_matches_sorted():
+    rng = np.random.default_rng(10)
+    # Repeated probabilities check that ties keep their input order like sorted()
+    zones = [{"probability": float(p), "coordinates": _ring(i, n=5), "evidence_type": f"zone{i}"}
+             for i, p in enumerate(rng.choice([0.1, 0.35, 0.5, 0.9], 30))]
+    
+    features = geojson_exporter.generate_geojson(zones)["features"]
+    
+    expected = sorted(zones, key=lambda z: z.get("probability", 0), reverse=True)
+    assert [f["properties"]["evidence_type"] for f in features] == [z["evidence_type"] for z in expected]
+    assert [f["properties"]["zone_rank"] for f in features] == list(range(1, 31))
+
+SQUARE = [[0, 0], [1, 0], [1, 1], [0, 0]]
+
+@pytest.mark.parametrize("zone", [
+    {"probability": 0.5, "coordinates": SQUARE},
+    {"probability": 0.5, "coordinates": [(0, 0), (1, 0), (1, 1)]},
+    {"probability": 0.5, "coordinates": [[-180, -90], [180, 90], [0, 0]]},
+    {"probability": 0.5, "coordinates": [[-180.1, 0], [1, 0], [1, 1]]},
+    {"probability": 0.5, "coordinates": [[0, 90.5], [1, 0], [1, 1]]},
+    {"probability": 0.5, "coordinates": [[0, math.nan], [1, 0], [1, 1]]},
+    {"probability": 0.5, "coordinates": [[0, 0, 0], [1, 0, 0], [1, 1, 0]]},
+    {"probability": 0.5, "coordinates": [[0, 0], [1, 0], [1]]},
+    {"probability": 0.5, "coordinates": [["a", "b"], ["c", "d"], ["e", "f"]]},
+    {"probability": 0.5, "coordinates": [[0, 0], [1, 0], None]},
+    {"probability": 0.5, "coordinates": [[True, False], [1, 0], [1, 1]]},
+    {"probability": 0.5, "coordinates": [[0, 0], [1, 0]]},
+    {"probability": 0.5, "coordinates": "0,0 1,0 1,1"},
+    {"probability": 1.5, "coordinates": SQUARE},
+    {"probability": -0.1, "coordinates": SQUARE},
+    {"coordinates": SQUARE},
+    {"probability": 0.5},
+    ["not", "a", "zone"]
+])
+def test_validate_zone_matches_baseline(zone):
+    assert geojson_exporter.validate_zone(zone) == _baseline_validate_zone(zone)
+
+PROBABILITIES = [0, 0.1, 0.2, 0.19999999999999998, 0.4, 0.5, 0.6, 0.6000000000000001, 0.8, 0.95, 1.0, -0.5, 1.5, math.nan]
+
+@pytest.mark.parametrize("probability", PROBABILITIES)
+def test_risk_level_matches_baseline(probability):
+    assert geojson_exporter.classify_risk_level(probability) == _baseline_risk_level(probability)
+
+def test_batch_risk_levels_match_baseline():
+    assert geojson_exporter.classify_risk_levels(PROBABILITIES) == [_baseline_risk_level(p) for p in PROBABILITIES]
+
+def test_batch_perimeters_match_baseline():
+    assert geojson_exporter.calculate_polygon_perimeters(RINGS) == [_baseline_perimeter(ring) for ring in RINGS]
+    assert geojson_exporter.calculate_polygon_perimeters([]) == []
+
+def test_geojson_matches_baseline():
+    rng = np.random.default_rng(11)
+    zones = [{"probability": float(p), "coordinates": _ring(i, n=int(rng.integers(3, 30)))}
+             for i, p in enumerate(rng.uniform(0, 1, 25))]
+    zones[3]["evidence_type"] = "debris_sighting"
+    # Invalid zones are skipped but still consume a rank
+    zones += [{"probability": 0.7, "coordinates": [[0, 0], [1, 1]]}, {"probability": 0.65}]
+    metadata = {"simulation_id": "sim-1"}
+    
+    geojson = geojson_exporter.generate_geojson(zones, metadata)
+    
+    assert _without_timestamps(geojson) == _baseline_generate_geojson(zones, metadata)
+
+def test_precomputed_zone_areas_match_baseline(monkeypatch):
+    monkeypatch.setattr(simulation_engine, "_HAS_ALPHASHAPE", False)
+    rng = np.random.default_rng(12)
+    start = simulation_engine.generate_start_positions(25.4, 87.6, 1000, 35000, rng=rng)
+    points = simulation_engine.simulate_flight_batch(start, 98, 236.6, 7.7, 110, 4000, 900)
+    zones = simulation_engine.generate_probability_zones(
+        points, simulation_engine.calculate_probability_density(points)
+    )
+    
+    geojson = _without_timestamps(geojson_exporter.generate_geojson(zones))
+    
+    # Upstream areas use the same shoelace approximation; only rounding may differ
+    expected = _baseline_generate_geojson(zones)
+    assert len(expected["features"]) == 3
+    for feature, reference in zip(geojson["features"], expected["features"]):
+        assert feature["properties"].pop("area_km2") == pytest.approx(reference["properties"].pop("area_km2"), abs=0.01)
+    assert geojson["properties"].pop("total_area_km2") == pytest.approx(
+        expected["properties"].pop("total_area_km2"), abs=0.01 * len(zones)
+    )
+    assert geojson == expected
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Regression tests for real-time data ingestion
+
+Run with: python -m pytest test_ingestion.py
+"""
+
+import asyncio
+import math
+import time
+
+import numpy as np
+import pytest
+
+from services import real_data_ingestor
+from services.database_manager import SARDatabase
+from services.real_data_ingestor import RealDataIngestor
+
+@pytest.fixture
+def ingestor(tmp_path):
+    """Ingestor writing to a database in a temporary directory"""
+    database = SARDatabase(str(tmp_path / "sar_test.db"))
+    yield RealDataIngestor(database=database)
+    database.close()
+
+def test_async_ingestion_does_not_block_event_loop(ingestor, monkeypatch):
+    def slow_opensky(*args, **kwargs):
+        time.sleep(0.5)
+        return None
+    
+    # Without aiohttp the async fetchers fall back to the blocking ones on worker threads
+    monkeypatch.setattr(ingestor, "fetch_opensky_state", slow_opensky)
+    monkeypatch.setattr(ingestor, "fetch_opensky_state_async",
+                        lambda aio=None, bbox=None: asyncio.to_thread(slow_opensky))
+    
+    async def run():
+        ticks = 0
+        
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.05)
+                ticks += 1
+        
+        task = asyncio.create_task(ticker())
+        result = await ingestor.build_simulation_input_with_cache_async()
+        task.cancel()
+        return result, ticks
+    
+    result, ticks = asyncio.run(run())
+    assert result is None
+    assert ticks >= 5  # The loop kept running while OpenSky was fetched
+
+def test_same_second_ingestions_store_separate_simulations(ingestor, monkeypatch):
+    now = time.time()
+    state = ["abc123", "TEST123 ", "Testland", now - 60, now - 60, -40.5, 35.2, 10000.0,
+             False, 230.0, 95.0, 0.0, None, 10100.0, "1200", False, 0]
+    
+    async def opensky(aio=None, bbox=None):
+        return {"time": int(now), "states": [state]}
+    
+    async def wind(lat, lon, aio=None):
+        return 7.5, 270.0
+    
+    async def elevation(lat, lon, aio=None):
+        return 0.0
+    
+    monkeypatch.setattr(ingestor, "fetch_opensky_state_async", opensky)
+    monkeypatch.setattr(ingestor, "fetch_openweather_wind_async", wind)
+    monkeypatch.setattr(ingestor, "fetch_open_elevation_async", elevation)
+    monkeypatch.setattr(time, "time", lambda: now)  # Both cycles land in the same second
+    
+    first = asyncio.run(ingestor.build_real_simulation_input_async())
+    second = asyncio.run(ingestor.build_real_simulation_input_async())
+    
+    assert first is not None and second is not None
+    with ingestor.db._get_connection() as conn:
+        ids = [row["id"] for row in conn.execute("SELECT id FROM simulation_results")]
+    assert len(ids) == 2 and len(set(ids)) == 2
+
+@pytest.mark.skipif(not real_data_ingestor._HAS_NUMBA, reason="numba not installed")
+def test_compiled_scores_match_numpy(monkeypatch):
+    rng = np.random.default_rng(42)
+    n = 5000
+    now = 1_750_000_000.0
+    altitude = rng.uniform(-100, 14000, n)
+    velocity = rng.uniform(0, 400, n)
+    last_contact = now - rng.uniform(0, 30000, n)
+    latitude = rng.uniform(-90, 90, n)
+    longitude = rng.uniform(-180, 180, n)
+    
+    # Missing values, zeros and exact tier/region boundaries
+    altitude[:4] = [np.nan, 0, 10000 / 3.28084, 35000 / 3.28084]
+    velocity[:4] = [np.nan, 0, 150 / 1.94384, 400 / 1.94384]
+    last_contact[:4] = [np.nan, now, now - 3600, now - 21600]
+    latitude[:6] = [np.nan, 0, 70, -60, 30, 23.5]
+    longitude[:6] = [10, np.nan, -70, 20, 120, -180]
+    
+    compiled = real_data_ingestor._sar_priority_scores(
+        altitude, velocity, last_contact, latitude, longitude, now
+    )
+    monkeypatch.setattr(real_data_ingestor, "_HAS_NUMBA", False)
+    reference = real_data_ingestor._sar_priority_scores(
+        altitude, velocity, last_contact, latitude, longitude, now
+    )
+    
+    np.testing.assert_array_equal(compiled, reference)
+
+@pytest.mark.parametrize("lat, lon", [
+    (0, 0), (0, -100), (0, 50), (0, 150), (23.5, 150), (-23.5, 150),
+    (70, 0), (-60, 0), (70.25, 0), (-60.25, 0), (30, 50), (0.25, 19.75),
+    (12.3, -70), (45.6, 20), (-10.1, 120), (-33.3, -180), (45.6, 7.8)
+])
+def test_region_matches_direct_classification(lat, lon):
+    ingestor = RealDataIngestor.__new__(RealDataIngestor)
+    assert ingestor._classify_geographic_region(lat, lon) == real_data_ingestor._classify_region(lat, lon)
+
+@pytest.mark.parametrize("elevation", [-0.5, 0, 999, 999.9, 1000, 1000.1, 2999, 3000, 3000.1, 4200])
+@pytest.mark.parametrize("lat, lon", [(45.6, 7.8), (0, 150), (23.5, 150), (-75.2, 10.4)])
+def test_complexity_matches_direct_classification(lat, lon, elevation):
+    ingestor = RealDataIngestor.__new__(RealDataIngestor)
+    region = real_data_ingestor._classify_region(lat, lon)
+    assert (ingestor._assess_search_complexity(lat, lon, elevation)
+            == real_data_ingestor._classify_complexity(region, elevation))
+
+def test_non_finite_inputs_classified_directly():
+    ingestor = RealDataIngestor.__new__(RealDataIngestor)
+    assert ingestor._classify_geographic_region(math.nan, 0) == real_data_ingestor._classify_region(math.nan, 0)
+    region = real_data_ingestor._classify_region(-33.3, 150.2)
+    assert (ingestor._assess_search_complexity(-33.3, 150.2, math.inf)
+            == real_data_ingestor._classify_complexity(region, math.inf))
@@ -54,7 +54,7 @@ async def test_integration():
         
         # Step 3: Test cache functionality
         print("\n3. Testing intelligent caching...")
-        cached_data = ingestor.build_simulation_input_with_cache(prefer_cache=True)
+        cached_data = await ingestor.build_simulation_input_with_cache_async(prefer_cache=True)
         
         if cached_data:
             if cached_data['data_source'].get('used_cached_data', False):
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Parity tests for search asset optimization against the original scalar implementation
+
+Run with: python -m pytest test_optimization.py
+"""
+
+import asyncio
+import math
+
+import numpy as np
+import pytest
+
+from schemas.asset import AssetType, SearchAsset
+from schemas.zone import Coordinate
+from services import optimization
+
+def _baseline_distance_nm(coord1, coord2):
+    """The original math-module haversine"""
+    lat1, lon1 = math.radians(coord1.lat), math.radians(coord1.lon)
+    lat2, lon2 = math.radians(coord2.lat), math.radians(coord2.lon)
+    a = math.sin((lat2 - lat1)/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1)/2)**2
+    return 3440.065 * 2 * math.asin(math.sqrt(a))
+
+def _baseline_waypoints(start, target_areas, speed_knots, max_time_hours):
+    """The original linear-scan nearest-neighbour route"""
+    waypoints, remaining, current, total_time = [start], list(target_areas), start, 0.0
+    while remaining and total_time < max_time_hours:
+        nearest = min(remaining, key=lambda area: _baseline_distance_nm(current, area))
+        travel_time = _baseline_distance_nm(current, nearest) / speed_knots
+        if total_time + travel_time > max_time_hours:
+            break
+        waypoints.append(nearest)
+        remaining.remove(nearest)
+        current = nearest
+        total_time += travel_time
+    return waypoints
+
+def _baseline_deployment(assets, search_zones):
+    """The original greedy deployment on lists of Coordinate models"""
+    areas = []
+    for zone in search_zones:
+        ring = zone["geometry"]["coordinates"][0]
+        if zone["properties"]["probability"] > 0.3:
+            areas.append(Coordinate(lat=sum(c[1] for c in ring) / len(ring), lon=sum(c[0] for c in ring) / len(ring)))
+    
+    def covered_by(waypoints):
+        return [area for area in areas if any(_baseline_distance_nm(w, area) < 10.0 for w in waypoints)]
+    
+    routes, covered = [], []
+    for asset in assets:
+        kind = asset.asset_type
+        max_time = min(asset.fuel_remaining / 100.0 * kind.endurance_hours, kind.endurance_hours * 0.8)
+        reachable = [area for area in areas
+                     if not any(_baseline_distance_nm(area, c) < 5.0 for c in covered)
+                     and _baseline_distance_nm(asset.current_location, area) <= kind.range_nm * 0.4]
+        if not reachable:
+            continue
+        waypoints = _baseline_waypoints(asset.current_location, reachable, kind.speed_knots, max_time)
+        length = sum(_baseline_distance_nm(a, b) for a, b in zip(waypoints, waypoints[1:]))
+        routes.append((waypoints, length / kind.speed_knots, length * kind.search_width_nm * 3.43,
+                       len(covered_by(waypoints)) / len(areas)))
+        covered.extend(waypoints)
+    
+    all_waypoints = [w for route in routes for w in route[0]]
+    uncovered = [area for area in areas if area not in covered_by(covered)]
+    return routes, len(covered_by(all_waypoints)) / len(areas), uncovered
+
+def _zone(lat, lon, probability, radius=0.3):
+    ring = [[lon + radius * math.cos(t), lat + radius * math.sin(t)] for t in np.linspace(0, 2 * math.pi, 8)]
+    return {"type": "Feature", "geometry": {"type": "Polygon", "coordinates": [ring]},
+            "properties": {"probability": probability}}
+
+def _asset(lat, lon, speed_knots=180.0, range_nm=1500.0, endurance_hours=8.0, fuel_remaining=100.0):
+    return SearchAsset(
+        id="asset", name="Test asset",
+        asset_type=AssetType(name="aircraft", speed_knots=speed_knots, range_nm=range_nm,
+                             search_width_nm=2.0, endurance_hours=endurance_hours),
+        current_location=Coordinate(lat=lat, lon=lon), fuel_remaining=fuel_remaining
+    )
+
+def _random_coordinates(seed, n, lat=(-80, 80), lon=(-180, 180)):
+    rng = np.random.default_rng(seed)
+    return [Coordinate(lat=float(a), lon=float(o)) for a, o in zip(rng.uniform(*lat, n), rng.uniform(*lon, n))]
+
+def test_distance_matches_baseline():
+    coords = _random_coordinates(seed=0, n=400) + [Coordinate(lat=0, lon=0), Coordinate(lat=0, lon=180)]
+    for coord1, coord2 in zip(coords[::2], coords[1::2]):
+        assert optimization.distance_nm(coord1, coord2) == pytest.approx(
+            _baseline_distance_nm(coord1, coord2), rel=1e-9, abs=1e-9
+        )
+    # Identical points and antipodes
+    assert optimization.distance_nm(coords[0], coords[0]) == 0.0
+    assert optimization.distance_nm(coords[-2], coords[-1]) == pytest.approx(3440.065 * math.pi, rel=1e-12)
+
+@pytest.mark.parametrize("seed, max_time_hours", [(1, 0.5), (2, 3.0), (3, 100.0), (4, 0.0)])
+def test_search_waypoints_match_baseline(seed, max_time_hours):
+    areas = _random_coordinates(seed, n=150, lat=(10, 20), lon=(60, 70))
+    asset = _asset(15.0, 65.0)
+    
+    waypoints = optimization.generate_search_waypoints(
+        asset, optimization.CoordArray.from_coordinates(areas), max_time_hours
+    )
+    
+    expected = _baseline_waypoints(asset.current_location, areas, 180.0, max_time_hours)
+    assert waypoints.to_coordinates() == expected
+
+@pytest.mark.parametrize("radius_nm", [5.0, 10.0, 60.0])
+def test_coverage_mask_matches_baseline(radius_nm):
+    areas = _random_coordinates(seed=5, n=300, lat=(-5, 5), lon=(170, 180))
+    waypoints = _random_coordinates(seed=6, n=40, lat=(-5, 5), lon=(170, 180))
+    # Areas sitting exactly on a waypoint, just inside and just outside the radius
+    offset = radius_nm / 60.0
+    areas += [waypoints[0], Coordinate(lat=waypoints[1].lat + offset * 0.999, lon=waypoints[1].lon),
+              Coordinate(lat=waypoints[2].lat + offset * 1.001, lon=waypoints[2].lon)]
+    
+    mask = optimization._coverage_mask(
+        optimization.CoordArray.from_coordinates(areas),
+        optimization.CoordArray.from_coordinates(waypoints), radius_nm
+    )
+    
+    expected = [any(_baseline_distance_nm(waypoint, area) < radius_nm for waypoint in waypoints) for area in areas]
+    assert mask.tolist() == expected
+    assert 0 < sum(expected) < len(areas)
+
+@pytest.mark.parametrize("fused", [True, False])
+def test_haversine_matrix_matches_baseline(monkeypatch, fused):
+    if fused:
+        if not optimization._HAS_NUMEXPR:
+            pytest.skip("numexpr not installed")
+        # Force the fused path on small inputs and single-core machines
+        monkeypatch.setattr(optimization, "NUMEXPR_MIN_ELEMENTS", 0)
+        monkeypatch.setattr(optimization.ne, "get_num_threads", lambda: 2)
+    rows = _random_coordinates(seed=7, n=30)
+    cols = _random_coordinates(seed=8, n=45) + rows[:3]
+    
+    matrix = optimization._haversine_matrix_nm(
+        optimization.coordinates_to_radians(rows), optimization.coordinates_to_radians(cols)
+    )
+    
+    expected = [[_baseline_distance_nm(row, col) for col in cols] for row in rows]
+    np.testing.assert_allclose(matrix, expected, rtol=1e-9, atol=1e-9)
+
+@pytest.mark.parametrize("seed", range(6))
+def test_deployment_matches_baseline(seed):
+    rng = np.random.default_rng(seed)
+    zones = [_zone(float(lat), float(lon), float(p))
+             for lat, lon, p in zip(rng.uniform(10, 14, 60), rng.uniform(60, 64, 60), rng.uniform(0, 1, 60))]
+    assets = [_asset(float(rng.uniform(9, 15)), float(rng.uniform(59, 65)),
+                     speed_knots=float(rng.uniform(80, 300)), range_nm=float(rng.uniform(100, 2000)),
+                     endurance_hours=float(rng.uniform(1, 12)), fuel_remaining=float(rng.uniform(10, 100)))
+              for _ in range(3)]
+    
+    response = asyncio.run(optimization.optimize_asset_deployment(assets, zones, {}))
+    
+    routes, total_coverage, uncovered = _baseline_deployment(assets, zones)
+    assert len(response.routes) == len(routes) > 0
+    for route, (waypoints, hours, area_km2, probability) in zip(response.routes, routes):
+        assert route.waypoints == waypoints
+        assert route.estimated_time_hours == pytest.approx(hours, rel=1e-9)
+        assert route.coverage_area_km2 == pytest.approx(area_km2, rel=1e-9)
+        assert route.probability_covered == probability
+    assert response.total_coverage == total_coverage
+    assert [tuple(f["geometry"]["coordinates"]) for f in response.uncovered_high_prob_areas] == [
+        (area.lon, area.lat) for area in uncovered
+    ]
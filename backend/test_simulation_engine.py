@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the Monte Carlo simulation engine
+
+Run with: python -m pytest test_simulation_engine.py
+"""
+
+import math
+import types
+
+import numpy as np
+import pytest
+from scipy.stats import gaussian_kde, spearmanr
+from shapely.geometry import MultiPoint, Polygon
+
+from services import simulation_engine
+from services.simulation_engine import EARTH_RADIUS, FUEL_FLOW_RATE, KNOTS_TO_MPS
+
+LEVELS = [0.95, 0.75, 0.50]
+
+def _crash_points(seed: int, n: int = 1000):
+    """Crash points and densities from the real pipeline for the schema's example telemetry"""
+    rng = np.random.default_rng(seed)
+    start = simulation_engine.generate_start_positions(25.4, 87.6, n, 35000, rng=rng)
+    points = simulation_engine.simulate_flight_batch(
+        start, 98, 460 * KNOTS_TO_MPS, 15 * KNOTS_TO_MPS, 110, 4000, 900
+    )
+    return points, simulation_engine.calculate_probability_density(points)
+
+def _use_alpha(monkeypatch, optimizealpha):
+    """Enable the alpha-shape path with a stand-in for alphashape.optimizealpha"""
+    monkeypatch.setattr(simulation_engine, "_HAS_ALPHASHAPE", True)
+    monkeypatch.setattr(simulation_engine, "alphashape",
+                        types.SimpleNamespace(optimizealpha=optimizealpha), raising=False)
+
+@pytest.mark.parametrize("alpha", [1e9, 5000.0])
+def test_fragmented_alpha_shapes_fall_back_to_convex_hull(monkeypatch, alpha):
+    # Huge alphas keep no triangles (empty shape) or leave a MultiPolygon
+    _use_alpha(monkeypatch, lambda points: alpha)
+    points, probabilities = _crash_points(seed=0)
+    
+    zones = simulation_engine.generate_probability_zones(points, probabilities, LEVELS)
+    
+    assert [zone["probability"] for zone in zones] == LEVELS
+    assert all(zone["area_km2"] > 0 for zone in zones)
+
+def _optimizealpha(points, upper=1e5, iterations=40):
+    """Bisection stand-in for alphashape.optimizealpha: largest alpha whose shape is one Polygon holding every point"""
+    points = np.asarray(points)
+    cloud = MultiPoint(points.tolist())
+    lo, hi = 0.0, upper
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        shape = simulation_engine._nested_alpha_shapes(points, [len(points)], mid)[0]
+        if shape.geom_type == 'Polygon' and shape.buffer(1e-12).contains(cloud):
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+@pytest.mark.parametrize("seed", [5, 22, 36])  # Seeds whose inner levels split on the shared triangulation
+def test_nested_alpha_shapes_one_polygon_per_level(seed):
+    points, probabilities = _crash_points(seed)
+    ranked = np.asarray(points)[:, ::-1][np.argsort(-probabilities, kind='stable')]
+    sizes = [int(len(ranked) * level) for level in LEVELS]
+    widest = ranked[:max(sizes)]
+    
+    shapes = simulation_engine._nested_alpha_shapes(widest, sizes, _optimizealpha(widest))
+    
+    assert [shape.geom_type for shape in shapes] == ['Polygon'] * len(LEVELS)
+
+def test_alpha_zones_one_per_level(monkeypatch):
+    _use_alpha(monkeypatch, _optimizealpha)
+    points, probabilities = _crash_points(seed=5)
+    
+    zones = simulation_engine.generate_probability_zones(points, probabilities, LEVELS)
+    
+    assert [zone["probability"] for zone in zones] == LEVELS
+
+def _baseline_flight(start_pos, heading, airspeed, wind_speed, wind_dir, fuel, time_since_contact):
+    """The original per-point simulate_flight"""
+    lat, lon = start_pos
+    max_flight_time = min(time_since_contact, fuel * 0.8 / FUEL_FLOW_RATE)
+    ground_n = airspeed * math.cos(math.radians(heading)) + wind_speed * math.cos(math.radians(wind_dir))
+    ground_e = airspeed * math.sin(math.radians(heading)) + wind_speed * math.sin(math.radians(wind_dir))
+    delta_lat = ground_n * max_flight_time / (EARTH_RADIUS * math.pi / 180)
+    delta_lon = ground_e * max_flight_time / (EARTH_RADIUS * math.pi / 180 * math.cos(math.radians(lat)))
+    return (lat + delta_lat, lon + delta_lon)
+
+@pytest.mark.parametrize("lat, heading, fuel, time_since_contact", [
+    (25.4, 98, 4000, 900), (-62.0, 300, 10, 7200), (0.0, 0, 0, 600), (71.5, 180, 90000, 3600)
+])
+def test_flight_batch_matches_baseline(lat, heading, fuel, time_since_contact):
+    start = simulation_engine.generate_start_positions(lat, 87.6, 500, 35000, rng=np.random.default_rng(0))
+    args = (heading, 460 * KNOTS_TO_MPS, 15 * KNOTS_TO_MPS, 110, fuel, time_since_contact)
+    
+    points = simulation_engine.simulate_flight_batch(start, *args)
+    
+    expected = [_baseline_flight(tuple(position), *args) for position in start.tolist()]
+    np.testing.assert_allclose(points, expected, rtol=0, atol=1e-10)
+
+@pytest.mark.skipif(not simulation_engine._HAS_NUMBA, reason="numba not installed")
+def test_compiled_displacement_matches_python():
+    start = simulation_engine.generate_start_positions(-45.0, 170.0, 2000, 35000, rng=np.random.default_rng(1))
+    
+    compiled = simulation_engine._displace_batch(start, 0.75, -1.25)
+    
+    reference = simulation_engine._displace_batch.py_func(start, 0.75, -1.25)
+    np.testing.assert_allclose(compiled, reference, rtol=1e-13, atol=0)
+
+@pytest.mark.parametrize("seed", [0, 4])
+def test_grid_density_tracks_exact_kde(seed):
+    points, probabilities = _crash_points(seed, n=5000)  # Above KDE_EXACT_MAX_POINTS
+    positions = points[:, ::-1].T
+    
+    exact = gaussian_kde(positions)(positions)
+    
+    # The binned FFT estimate stays within ~1% of the exact density and preserves its ranking
+    assert np.abs(probabilities - exact).max() <= 0.02 * exact.max()
+    assert np.median(np.abs(probabilities - exact) / exact) < 0.01
+    assert spearmanr(probabilities, exact).correlation > 0.999
+
+def test_small_batches_use_exact_kde():
+    points, probabilities = _crash_points(seed=1, n=simulation_engine.KDE_EXACT_MAX_POINTS)
+    positions = points[:, ::-1].T
+    np.testing.assert_allclose(probabilities, gaussian_kde(positions)(positions), rtol=1e-12)
+
+def _baseline_zone_area(coordinates):
+    """The original shapely-based calculate_zone_area"""
+    try:
+        return round(Polygon(coordinates).area * (111.32 ** 2), 2)
+    except Exception:
+        return 0.0
+
+@pytest.mark.parametrize("coordinates", [
+    [(0, 0), (1, 0), (1, 1), (0, 1), (0, 0)],
+    [(0, 0), (0, 1), (1, 1), (1, 0)],  # Clockwise and left open
+    [(87.1, 25.2), (87.9, 25.0), (88.2, 25.7), (87.6, 26.1), (87.4, 25.5), (87.1, 25.2)],  # Concave
+    [(-179.5, -10.0), (179.5, -10.0), (179.5, 10.0)],
+    [[0.0, 0.0], [2.0, 0.0], [1.0, 0.0]],  # Degenerate
+    [(0, 0), (1, 1)],
+    []
+])
+def test_zone_area_matches_baseline(coordinates):
+    assert simulation_engine.calculate_zone_area(coordinates) == _baseline_zone_area(coordinates)
+
+def test_generated_zone_areas_match_baseline(monkeypatch):
+    monkeypatch.setattr(simulation_engine, "_HAS_ALPHASHAPE", False)
+    points, probabilities = _crash_points(seed=2)
+    for zone in simulation_engine.generate_probability_zones(points, probabilities, LEVELS):
+        assert zone["area_km2"] == pytest.approx(_baseline_zone_area(zone["coordinates"]), abs=0.01)
+
+def _baseline_simple_zones(points, levels):
+    """The original per-angle statistical ellipses"""
+    center_lat, center_lon = np.mean([p[0] for p in points]), np.mean([p[1] for p in points])
+    std_lat, std_lon = np.std([p[0] for p in points]), np.std([p[1] for p in points])
+    zones = []
+    for level in levels:
+        coords = [[center_lon + std_lon / level * np.cos(angle), center_lat + std_lat / level * np.sin(angle)]
+                  for angle in np.linspace(0, 2*np.pi, 20)]
+        coords.append(coords[0])
+        zones.append({"coordinates": coords, "probability": level, "area_km2": _baseline_zone_area(coords)})
+    return zones
+
+def test_simple_zones_match_baseline():
+    points, probabilities = _crash_points(seed=3)
+    
+    zones = simulation_engine.generate_simple_probability_zones(points, probabilities, LEVELS)
+    
+    expected = _baseline_simple_zones([tuple(p) for p in points.tolist()], LEVELS)
+    assert [zone["probability"] for zone in zones] == LEVELS
+    for zone, reference in zip(zones, expected):
+        np.testing.assert_allclose(zone["coordinates"], reference["coordinates"], rtol=1e-12)
+        assert zone["area_km2"] == pytest.approx(reference["area_km2"], abs=0.01)
@@ -1,12 +1,60 @@
+import itertools
 import json
+import math
 import numpy as np
 from typing import List, Dict, Any, Tuple
 from datetime import datetime
-from shapely.geometry import Polygon, Point
 import logging
 
+try:
+    from numba import njit
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+    
+    def njit(*args, **kwargs):
+        """No-op stand-in so the kernels below run as plain Python"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+try:
+    import orjson
+    _HAS_ORJSON = True
+except ImportError:
+    _HAS_ORJSON = False
+
 logger = logging.getLogger(__name__)
 
+EARTH_RADIUS_KM = 6371.0
+
+# Risk level i applies once the probability reaches _RISK_THRESHOLDS[i - 1]
+_RISK_THRESHOLDS = np.array([0.2, 0.4, 0.6, 0.8])
+_RISK_LABELS = ("minimal", "low", "medium", "high", "critical")
+
+@njit(cache=True, fastmath=True)
+def _haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km between two points given in degrees"""
+    lat1 = math.radians(lat1)
+    lon1 = math.radians(lon1)
+    lat2 = math.radians(lat2)
+    lon2 = math.radians(lon2)
+    
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
+    return EARTH_RADIUS_KM * 2 * math.asin(math.sqrt(a))
+
+@njit(cache=True, fastmath=True)
+def _shoelace_deg2(x, y):
+    """Unsigned shoelace area of the closed ring through (x[i], y[i])"""
+    n = x.shape[0]
+    twice_area = 0.0
+    for i in range(n):
+        j = i + 1 if i + 1 < n else 0
+        twice_area += x[i] * y[j] - x[j] * y[i]
+    return 0.5 * abs(twice_area)
+
 def generate_geojson(zones: List[Dict[str, Any]], metadata: Dict[str, Any] = None) -> Dict[str, Any]:
     """
     Convert probability zones to GeoJSON format with proper nesting and metadata.
@@ -18,53 +66,82 @@ def generate_geojson(zones: List[Dict[str, Any]], metadata: Dict[str, Any] = Non
     Returns:
         Complete GeoJSON FeatureCollection with probability zones
     """
-    features = []
-    
     if not zones:
         logger.warning("No zones provided for GeoJSON generation")
         return create_empty_geojson()
     
-    # Sort zones by probability (highest first for proper rendering)
-    sorted_zones = sorted(zones, key=lambda z: z.get("probability", 0), reverse=True)
+    # One timestamp for the whole collection and all of its features
+    now_iso = datetime.now().isoformat()
     
+    # Sort zones by probability (highest first for proper rendering); the
+    # stable argsort keeps input order among equal probabilities like sorted()
+    probabilities = np.fromiter((z.get("probability", 0) for z in zones), dtype=np.float64, count=len(zones))
+    sorted_zones = [zones[k] for k in np.argsort(-probabilities, kind="stable")]
+    
+    # Validate zone structure up front so all areas are computed in one batch
+    valid_zones = []
     for i, zone in enumerate(sorted_zones):
         try:
-            # Validate zone structure
             if not validate_zone(zone):
                 logger.warning(f"Invalid zone structure at index {i}, skipping")
                 continue
-            
-            probability = zone.get("probability", 0.0)
-            coordinates = zone.get("coordinates", [])
-            
-            # Create feature with comprehensive properties
-            feature = {
-                "type": "Feature",
-                "geometry": {
-                    "type": "Polygon",
-                    "coordinates": [coordinates] if coordinates else []
-                },
-                "properties": {
-                    "probability": probability,
-                    "risk_level": classify_risk_level(probability),
-                    "zone_rank": i + 1,
-                    "area_km2": calculate_polygon_area(coordinates) if coordinates else 0,
-                    "perimeter_km": calculate_polygon_perimeter(coordinates) if coordinates else 0,
-                    "created_at": datetime.now().isoformat()
-                }
-            }
-            
-            # Add zone-specific metadata if available
-            if 'area_km2' in zone:
-                feature["properties"]["calculated_area_km2"] = zone['area_km2']
-            if 'evidence_type' in zone:
-                feature["properties"]["evidence_type"] = zone['evidence_type']
-            
-            features.append(feature)
-            
+            valid_zones.append((i, zone))
         except Exception as e:
             logger.error(f"Error processing zone {i}: {str(e)}")
-            continue
+    
+    # Property columns for the valid zones, filled in one pass each
+    ranks = [i + 1 for i, _ in valid_zones]
+    probs = [zone["probability"] for _, zone in valid_zones]
+    coordinate_lists = [zone["coordinates"] for _, zone in valid_zones]
+    
+    # Reuse measurements the upstream pipeline already computed (same
+    # approximations) and only batch the zones that lack them
+    areas = [zone.get("area_km2") for _, zone in valid_zones]
+    missing = [k for k, area in enumerate(areas) if not isinstance(area, (int, float))]
+    for k, area in zip(missing, calculate_polygon_areas([coordinate_lists[k] for k in missing])):
+        areas[k] = area
+    
+    perims = [zone.get("perimeter_km") for _, zone in valid_zones]
+    missing = [k for k, perimeter in enumerate(perims) if perimeter is None]
+    for k, perimeter in zip(missing, calculate_polygon_perimeters([coordinate_lists[k] for k in missing])):
+        perims[k] = perimeter
+    
+    risks = [
+        zone.get("risk_level", risk_level)
+        for (_, zone), risk_level in zip(valid_zones, classify_risk_levels(probs))
+    ]
+    
+    # Assemble the feature dicts from the columns in one go
+    features = [
+        {
+            "type": "Feature",
+            "geometry": {
+                "type": "Polygon",
+                "coordinates": [coordinates]
+            },
+            "properties": {
+                "probability": probability,
+                "risk_level": risk_level,
+                "zone_rank": rank,
+                "area_km2": area_km2,
+                "perimeter_km": perimeter_km,
+                "created_at": now_iso
+            }
+        }
+        for rank, probability, risk_level, area_km2, perimeter_km, coordinates
+        in zip(ranks, probs, risks, areas, perims, coordinate_lists)
+    ]
+    
+    # Add zone-specific metadata if available
+    for feature, (_, zone) in zip(features, valid_zones):
+        if 'area_km2' in zone:
+            feature["properties"]["calculated_area_km2"] = zone['area_km2']
+        if 'evidence_type' in zone:
+            feature["properties"]["evidence_type"] = zone['evidence_type']
+    
+    # Zones are sorted, so the first feature carries the highest probability
+    max_probability = probs[0] if probs else 0
+    total_area_km2 = sum(areas)
     
     # Create comprehensive GeoJSON with metadata
     geojson = {
@@ -72,9 +149,9 @@ def generate_geojson(zones: List[Dict[str, Any]], metadata: Dict[str, Any] = Non
         "features": features,
         "properties": {
             "total_zones": len(features),
-            "max_probability": max([f["properties"]["probability"] for f in features]) if features else 0,
-            "total_area_km2": sum([f["properties"]["area_km2"] for f in features]),
-            "generated_at": datetime.now().isoformat(),
+            "max_probability": max_probability,
+            "total_area_km2": total_area_km2,
+            "generated_at": now_iso,
             "coordinate_system": "WGS84",
             "simulation_metadata": metadata or {}
         },
@@ -107,95 +184,139 @@ def validate_zone(zone: Dict[str, Any]) -> bool:
     if not isinstance(coordinates, list) or len(coordinates) < 3:
         return False
     
-    # Check if coordinates form a valid polygon (at least 3 points)
+    # Check if coordinates form a valid polygon: numeric (lon, lat) pairs in range
     try:
-        for coord in coordinates:
-            if not isinstance(coord, (list, tuple)) or len(coord) != 2:
-                return False
-            lon, lat = coord
-            if not (-180 <= lon <= 180) or not (-90 <= lat <= 90):
-                return False
+        ring = np.asarray(coordinates)
     except (TypeError, ValueError):
         return False
+    if ring.ndim != 2 or ring.shape[1] != 2 or ring.dtype.kind not in "biuf":
+        return False
     
-    return True
+    lon = ring[:, 0]
+    lat = ring[:, 1]
+    return bool(np.logical_and.reduce([lon >= -180, lon <= 180, lat >= -90, lat <= 90]).all())
 
 def classify_risk_level(probability: float) -> str:
     """Classify risk level based on probability"""
-    if probability >= 0.8:
-        return "critical"
-    elif probability >= 0.6:
-        return "high"
-    elif probability >= 0.4:
-        return "medium"
-    elif probability >= 0.2:
-        return "low"
-    else:
-        return "minimal"
+    return classify_risk_levels([probability])[0]
+
+def classify_risk_levels(probabilities: List[float]) -> List[str]:
+    """Classify the risk level of many probabilities with one searchsorted pass"""
+    values = np.asarray(probabilities, dtype=np.float64)
+    # side='right' makes each threshold inclusive; NaN stays "minimal" as in a failed comparison
+    tiers = np.where(np.isnan(values), 0, np.searchsorted(_RISK_THRESHOLDS, values, side='right'))
+    return [_RISK_LABELS[tier] for tier in tiers.tolist()]
 
 def calculate_polygon_area(coordinates: List[List[float]]) -> float:
-    """Calculate polygon area in km² using Shapely"""
+    """Calculate polygon area in km² using the shoelace formula"""
     try:
         if len(coordinates) < 3:
             return 0.0
         
-        # Create Shapely polygon
-        polygon = Polygon(coordinates)
+        ring = np.asarray(coordinates, dtype=np.float64)
+        x = ring[:, 0]
+        y = ring[:, 1]
         
         # Area in square degrees (approximate)
-        area_deg2 = polygon.area
+        if _HAS_NUMBA:
+            area_deg2 = _shoelace_deg2(x, y)
+        else:
+            area_deg2 = 0.5 * abs(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
         
         # Convert to km² (rough approximation at equator)
         # 1 degree ≈ 111.32 km at equator
         area_km2 = area_deg2 * (111.32 ** 2)
         
-        return round(area_km2, 2)
+        return round(float(area_km2), 2)
         
     except Exception as e:
         logger.warning(f"Failed to calculate polygon area: {str(e)}")
         return 0.0
 
+def calculate_polygon_areas(coordinate_lists: List[List[List[float]]]) -> List[float]:
+    """
+    Calculate the areas in km² of many polygons in one vectorized pass.
+    
+    Uses the same shoelace approximation as calculate_polygon_area. Rings
+    are concatenated and each ring's cross products are summed with
+    np.add.reduceat. Every ring must have at least 3 (lon, lat) vertices.
+    """
+    if not coordinate_lists:
+        return []
+    
+    rings = [np.asarray(coordinates, dtype=np.float64) for coordinates in coordinate_lists]
+    lengths = np.array([len(ring) for ring in rings])
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    vertices = np.concatenate(rings)
+    x = vertices[:, 0]
+    y = vertices[:, 1]
+    
+    # Index of the next vertex within the same ring, wrapping at each ring's end
+    following = np.arange(1, len(vertices) + 1)
+    following[starts + lengths - 1] = starts
+    
+    cross = x * y[following] - x[following] * y
+    area_deg2 = 0.5 * np.abs(np.add.reduceat(cross, starts))
+    return [round(float(area), 2) for area in area_deg2 * (111.32 ** 2)]
+
+def calculate_polygon_perimeters(coordinate_lists: List[List[List[float]]]) -> List[float]:
+    """
+    Calculate the perimeters in km of many polygons in one vectorized pass.
+    
+    Uses the same haversine ring length as calculate_polygon_perimeter, with
+    each ring's edge lengths summed by np.add.reduceat. Every ring must have
+    at least 2 (lon, lat) vertices.
+    """
+    if not coordinate_lists:
+        return []
+    
+    rings = [np.asarray(coordinates, dtype=np.float64) for coordinates in coordinate_lists]
+    lengths = np.array([len(ring) for ring in rings])
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    vertices = np.concatenate(rings)
+    lat = np.deg2rad(vertices[:, 1])
+    lon = np.deg2rad(vertices[:, 0])
+    
+    # Index of the next vertex within the same ring, wrapping at each ring's end
+    following = np.arange(1, len(vertices) + 1)
+    following[starts + lengths - 1] = starts
+    
+    cos_lat = np.cos(lat)
+    a = np.sin((lat[following] - lat) / 2)**2 + cos_lat * cos_lat[following] * np.sin((lon[following] - lon) / 2)**2
+    edges = EARTH_RADIUS_KM * 2 * np.arcsin(np.sqrt(a))
+    return [round(float(perimeter), 2) for perimeter in np.add.reduceat(edges, starts)]
+
 def calculate_polygon_perimeter(coordinates: List[List[float]]) -> float:
     """Calculate polygon perimeter in km"""
     try:
         if len(coordinates) < 2:
             return 0.0
         
-        total_distance = 0.0
-        for i in range(len(coordinates)):
-            # Get current and next point (wrap around)
-            p1 = coordinates[i]
-            p2 = coordinates[(i + 1) % len(coordinates)]
-            
-            # Calculate distance using haversine formula
-            distance = haversine_distance(p1[1], p1[0], p2[1], p2[0])
-            total_distance += distance
-        
-        return round(total_distance, 2)
+        return round(_perimeter_km_vec(np.asarray(coordinates, dtype=np.float64)), 2)
         
     except Exception as e:
         logger.warning(f"Failed to calculate polygon perimeter: {str(e)}")
         return 0.0
 
+def _perimeter_km_vec(coords: np.ndarray) -> float:
+    """Haversine length of the closed ring through (N, 2) lon/lat vertices in km"""
+    lat = np.deg2rad(coords[:, 1])
+    lon = np.deg2rad(coords[:, 0])
+    
+    # Edge i runs from vertex i to vertex i + 1, wrapping back to the first
+    dlat = np.diff(lat, append=lat[:1])
+    dlon = np.diff(lon, append=lon[:1])
+    cos_lat = np.cos(lat)
+    a = np.sin(dlat / 2)**2 + cos_lat * np.roll(cos_lat, -1) * np.sin(dlon / 2)**2
+    return float(EARTH_RADIUS_KM * 2 * np.arcsin(np.sqrt(a)).sum())
+
 def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """Calculate haversine distance between two points in km"""
-    import math
-    
-    # Convert to radians
-    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-    
-    # Haversine formula
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-    c = 2 * math.asin(math.sqrt(a))
-    
-    # Earth radius in km
-    earth_radius = 6371.0
-    return earth_radius * c
+    return _haversine_km(float(lat1), float(lon1), float(lat2), float(lon2))
 
 def create_empty_geojson() -> Dict[str, Any]:
     """Create empty GeoJSON structure"""
+    now_iso = datetime.now().isoformat()
     return {
         "type": "FeatureCollection",
         "features": [],
@@ -203,7 +324,7 @@ def create_empty_geojson() -> Dict[str, Any]:
             "total_zones": 0,
             "max_probability": 0,
             "total_area_km2": 0,
-            "generated_at": datetime.now().isoformat(),
+            "generated_at": now_iso,
             "status": "no_zones_generated"
         }
     }
@@ -211,8 +332,15 @@ def create_empty_geojson() -> Dict[str, Any]:
 def export_geojson_to_file(geojson: Dict[str, Any], filepath: str) -> bool:
     """Export GeoJSON to file"""
     try:
-        with open(filepath, 'w') as f:
-            json.dump(geojson, f, indent=2)
+        if _HAS_ORJSON:
+            with open(filepath, 'wb') as f:
+                f.write(orjson.dumps(
+                    geojson,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+                ))
+        else:
+            with open(filepath, 'w') as f:
+                json.dump(geojson, f, indent=2)
         
         logger.info(f"GeoJSON exported to {filepath}")
         return True
@@ -258,23 +386,33 @@ def validate_geojson(geojson: Dict[str, Any]) -> Tuple[bool, List[str]]:
 
 def merge_geojson_features(geojson_list: List[Dict[str, Any]]) -> Dict[str, Any]:
     """Merge multiple GeoJSON FeatureCollections into one"""
-    merged_features = []
+    collections = [
+        geojson for geojson in geojson_list
+        if geojson.get("type") == "FeatureCollection"
+    ]
+    merged_features = list(itertools.chain.from_iterable(
+        geojson.get("features", []) for geojson in collections
+    ))
     merged_metadata = {}
+    # Merge op per metadata key, resolved from the first value seen for it
+    merge_ops = {}
     
-    for geojson in geojson_list:
-        if geojson.get("type") == "FeatureCollection":
-            merged_features.extend(geojson.get("features", []))
-            
-            # Merge metadata
-            properties = geojson.get("properties", {})
-            for key, value in properties.items():
-                if key in merged_metadata:
-                    if isinstance(value, (int, float)):
-                        merged_metadata[key] += value
-                    elif isinstance(value, list):
-                        merged_metadata[key].extend(value)
+    for geojson in collections:
+        properties = geojson.get("properties", {})
+        for key, value in properties.items():
+            op = merge_ops.get(key)
+            if op is None:
+                if isinstance(value, (int, float)):
+                    merge_ops[key] = "sum"
+                elif isinstance(value, list):
+                    merge_ops[key] = "extend"
                 else:
-                    merged_metadata[key] = value
+                    merge_ops[key] = "first"
+                merged_metadata[key] = value
+            elif op == "sum":
+                merged_metadata[key] += value
+            elif op == "extend":
+                merged_metadata[key].extend(value)
     
     return {
         "type": "FeatureCollection",
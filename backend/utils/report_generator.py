@@ -1,5 +1,9 @@
 import os
+import csv
+import asyncio
+import itertools
 import json
+import numpy as np
 from typing import Dict, Any, Optional
 from datetime import datetime
 from reportlab.lib.pagesizes import letter, A4
@@ -10,32 +14,47 @@ from reportlab.lib.units import inch
 from io import BytesIO
 import base64
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
 class SAR_ReportGenerator:
     """Generate comprehensive SAR mission reports in PDF and other formats"""
     
+    # Stylesheet shared by all instances; built on first use
+    _styles_cache = None
+    _styles_lock = threading.Lock()
+    
     def __init__(self, output_dir: str = "exports"):
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
+        self.styles = self._get_styles()
+    
+    @classmethod
+    def _get_styles(cls):
+        """Return the shared stylesheet, building it once per process"""
+        with cls._styles_lock:
+            if cls._styles_cache is None:
+                styles = getSampleStyleSheet()
+                cls._setup_custom_styles(styles)
+                cls._styles_cache = styles
+            return cls._styles_cache
     
-    def _setup_custom_styles(self):
+    @staticmethod
+    def _setup_custom_styles(styles):
         """Setup custom paragraph styles for the report"""
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='CustomTitle',
-            parent=self.styles['Heading1'],
+            parent=styles['Heading1'],
             fontSize=18,
             spaceAfter=30,
             textColor=colors.darkblue,
             alignment=1  # Center alignment
         ))
         
-        self.styles.add(ParagraphStyle(
+        styles.add(ParagraphStyle(
             name='SectionHeader',
-            parent=self.styles['Heading2'],
+            parent=styles['Heading2'],
             fontSize=14,
             spaceAfter=12,
             textColor=colors.darkred,
@@ -56,39 +75,8 @@ class SAR_ReportGenerator:
             filename = f"SAR_Report_{export_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
             filepath = os.path.join(self.output_dir, filename)
             
-            # Create PDF document
-            doc = SimpleDocTemplate(filepath, pagesize=A4)
-            story = []
-            
-            # Title
-            title = request_params.get('title', 'SAR Aircraft Disappearance Analysis Report')
-            story.append(Paragraph(title, self.styles['CustomTitle']))
-            story.append(Spacer(1, 20))
-            
-            # Mission Information
-            story.extend(self._create_mission_info_section(request_params, simulation_data))
-            
-            # Executive Summary
-            story.extend(self._create_executive_summary(simulation_data))
-            
-            # Simulation Parameters
-            story.extend(self._create_simulation_parameters(simulation_data))
-            
-            # Results Analysis
-            story.extend(self._create_results_analysis(simulation_data))
-            
-            # Search Zone Details
-            story.extend(self._create_search_zone_details(simulation_data))
-            
-            # Recommendations
-            story.extend(self._create_recommendations(simulation_data))
-            
-            # Map visualization (if requested)
-            if request_params.get('include_map', True):
-                story.extend(self._create_map_section(simulation_data))
-            
-            # Build PDF
-            doc.build(story)
+            # ReportLab is synchronous; build off the event loop
+            await asyncio.to_thread(self._build_pdf_report, filepath, simulation_data, request_params)
             
             logger.info(f"PDF report generated: {filepath}")
             return filepath
@@ -97,6 +85,41 @@ class SAR_ReportGenerator:
             logger.error(f"PDF generation failed: {str(e)}")
             raise
     
+    def _build_pdf_report(self, filepath: str, simulation_data: Dict[str, Any], request_params: Dict[str, Any]):
+        """Lay out the report story and write the PDF to filepath"""
+        doc = SimpleDocTemplate(filepath, pagesize=A4)
+        story = []
+        
+        # Title
+        title = request_params.get('title', 'SAR Aircraft Disappearance Analysis Report')
+        story.append(Paragraph(title, self.styles['CustomTitle']))
+        story.append(Spacer(1, 20))
+        
+        # Mission Information
+        story.extend(self._create_mission_info_section(request_params, simulation_data))
+        
+        # Executive Summary
+        story.extend(self._create_executive_summary(simulation_data))
+        
+        # Simulation Parameters
+        story.extend(self._create_simulation_parameters(simulation_data))
+        
+        # Results Analysis
+        story.extend(self._create_results_analysis(simulation_data))
+        
+        # Search Zone Details
+        story.extend(self._create_search_zone_details(simulation_data))
+        
+        # Recommendations
+        story.extend(self._create_recommendations(simulation_data))
+        
+        # Map visualization (if requested)
+        if request_params.get('include_map', True):
+            story.extend(self._create_map_section(simulation_data))
+        
+        # Build PDF
+        doc.build(story)
+    
     def _create_mission_info_section(self, request_params: Dict[str, Any], simulation_data: Dict[str, Any]) -> list:
         """Create mission information section"""
         story = []
@@ -356,32 +379,7 @@ async def generate_csv_export(export_id: str, simulation_data: Dict[str, Any]):
         geojson = simulation_data.get('geojson', {})
         features = geojson.get('features', [])
         
-        # Create CSV content
-        csv_lines = ['Zone_ID,Probability,Area_km2,Risk_Level,Latitude,Longitude,Perimeter_km']
-        
-        for i, feature in enumerate(features):
-            props = feature.get('properties', {})
-            geom = feature.get('geometry', {})
-            
-            # Calculate centroid for lat/lon
-            if geom.get('type') == 'Polygon' and geom.get('coordinates'):
-                coords = geom['coordinates'][0]
-                if coords:
-                    avg_lat = sum(coord[1] for coord in coords) / len(coords)
-                    avg_lon = sum(coord[0] for coord in coords) / len(coords)
-                else:
-                    avg_lat = avg_lon = 0
-            else:
-                avg_lat = avg_lon = 0
-            
-            csv_line = f"{i+1},{props.get('probability', 0):.4f},{props.get('area_km2', 0):.2f}," \
-                      f"{props.get('risk_level', 'unknown')},{avg_lat:.6f},{avg_lon:.6f}," \
-                      f"{props.get('perimeter_km', 0):.2f}"
-            csv_lines.append(csv_line)
-        
-        # Write CSV file
-        with open(filepath, 'w', newline='') as f:
-            f.write('\n'.join(csv_lines))
+        await asyncio.to_thread(_write_csv_export, filepath, features)
         
         logger.info(f"CSV export generated: {filepath}")
         return filepath
@@ -389,3 +387,57 @@ async def generate_csv_export(export_id: str, simulation_data: Dict[str, Any]):
     except Exception as e:
         logger.error(f"CSV generation failed: {str(e)}")
         raise
+
+def _write_csv_export(filepath: str, features: list):
+    """Write one CSV row per zone feature"""
+    centroids = _ring_centroids(features)
+    
+    with open(filepath, 'w', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(['Zone_ID', 'Probability', 'Area_km2', 'Risk_Level', 'Latitude', 'Longitude', 'Perimeter_km'])
+        writer.writerows(
+            (
+                i + 1,
+                f"{props.get('probability', 0):.4f}",
+                f"{props.get('area_km2', 0):.2f}",
+                props.get('risk_level', 'unknown'),
+                f"{avg_lat:.6f}",
+                f"{avg_lon:.6f}",
+                f"{props.get('perimeter_km', 0):.2f}"
+            )
+            for i, (props, (avg_lon, avg_lat)) in enumerate(zip(
+                (feature.get('properties', {}) for feature in features), centroids.tolist()
+            ))
+        )
+
+def _ring_centroids(features: list) -> np.ndarray:
+    """(N, 2) lon/lat vertex means of each Polygon's outer ring, zero where absent"""
+    centroids = np.zeros((len(features), 2), dtype=np.float64)
+    
+    rows = []
+    rings = []
+    for i, feature in enumerate(features):
+        geom = feature.get('geometry', {})
+        if geom.get('type') == 'Polygon' and geom.get('coordinates') and len(geom['coordinates'][0]):
+            rows.append(i)
+            rings.append(geom['coordinates'][0])
+    if not rings:
+        return centroids
+    
+    # One conversion for every ring, then per-ring sums with reduceat
+    try:
+        vertices = np.array(list(itertools.chain.from_iterable(rings)), dtype=np.float64)
+    except ValueError:
+        vertices = None
+    if vertices is not None and vertices.ndim == 2:
+        lengths = np.fromiter((len(ring) for ring in rings), dtype=np.intp, count=len(rings))
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        centroids[rows] = np.add.reduceat(vertices[:, :2], starts, axis=0) / lengths[:, None]
+        return centroids
+    
+    # Ragged vertex widths; fall back to one ring at a time
+    for i, ring in zip(rows, rings):
+        coords = np.asarray(ring, dtype=np.float64)
+        if coords.ndim == 2:
+            centroids[i] = coords[:, :2].mean(axis=0)
+    return centroids